@@ -17,6 +17,7 @@ import os
 import pytesseract
 from PIL import Image
 import winsound
+from segment_qc import ECG_SEGMENT_REGION, YELLOW_RATIO_THRESHOLD, has_yellow_peaks
 
 # %% ---------------------------------------------------------
 # Asking user for settings via console
@@ -102,19 +103,10 @@ def type_text(text, delay=0.1):
 
 # ------------------------------------------------------------
 # Visual checker for detecting problematic R peaks
-def segment_has_yellow_peaks(region=(403, 274, 700, 128), threshold=0.0001):
+def segment_has_yellow_peaks(region=ECG_SEGMENT_REGION, threshold=YELLOW_RATIO_THRESHOLD):
     time.sleep(1)
-    screenshot_path = "ecg_segment.png"
-    pyautogui.screenshot(screenshot_path, region=region)
-    img = Image.open(screenshot_path).convert("RGB")
-    yellow_count = 0
-    total_pixels = img.width * img.height
-    for r, g, b in img.getdata():
-        if r > 180 and g > 180 and b < 100:
-            yellow_count += 1
-    yellow_ratio = yellow_count / total_pixels
-    print(f"Yellow pixel ratio: {yellow_ratio:.6f}")
-    return yellow_ratio > threshold
+    img = pyautogui.screenshot(region=region)
+    return has_yellow_peaks(img, threshold=threshold)
 
 # ------------------------------------------------------------
 # Utility helper
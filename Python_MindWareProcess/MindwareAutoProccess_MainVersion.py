@@ -10,13 +10,26 @@ This code is for Automating MindWare HRV (Main Version) workflow
 # ------------------------------------------------------------
 
 import pyautogui
-import pygetwindow as gw   
 import time
-import subprocess
 import os
-import pytesseract
-from PIL import Image
 import winsound
+from acq_reader import segment_count
+from app_launcher import attach_or_launch, mindware_problem, restart_mindware
+from export_watch import wait_for_export
+from ocr_engine import LETTERS_DIGITS, read_text
+from popup_watch import PopupWatcher, input_lock
+from resume_manifest import EXPORTED, FAILED, HEARTBEAT_INTERVAL, IN_PROGRESS, ResumeManifest
+from review_queue import ReviewQueue
+from screen_capture import grab
+from segment_pipeline import SegmentClassifier
+from settings_state import SettingsState
+from segment_qc import ECG_SEGMENT_REGION, YELLOW_RATIO_THRESHOLD, has_yellow_peaks, yellow_ratio
+from step_trace import add_retry, annotate, set_file, set_outcome, start_trace, step
+from text_entry import paste_and_verify
+from template_cache import locate_template_center, preload_templates
+from ui_sync import grab_region, wait_for_redraw, wait_for_region_change, wait_for_region_stable, wait_for_template
+from workflow_state import (ANALYZED, CHANNEL_MAPPED, CONFIGURED, EVENT_ADDED, OPENED, REVIEWED,
+                            OperatorNeeded, Watchdog, WorkflowRunner, WorkflowStep)
 
 # %% ---------------------------------------------------------
 # Asking user for settings via console
@@ -53,6 +66,18 @@ output_folder = r"C:\Users\user\Downloads\ECG-60-Hz-Noise"
 segment_time = int(input("Enter segment time in seconds (default 60): ") or 60)
 max_number_of_seg = int(input("Enter The Maximum Number of Segments in Each File (default 20): ") or 20)
 
+# Run modes
+print("\nSelect run mode:")
+print("1 = Attended - stop at every segment with yellow peaks (default)")
+print("2 = Unattended - queue segments with yellow peaks for a later review session")
+print("3 = Review - reopen only the queued files, fix the flagged segments and re-export")
+run_mode = input("Enter choice (1/2/3): ").strip() or "1"
+unattended = run_mode == "2"
+review_mode = run_mode == "3"
+
+# Pipelined checks: segments are scored in the background while the driver moves on
+pipelined_checks = (input("Pipelined segment checks - fix flagged segments after the last one? (y/N): ").strip().lower() or "n") == "y"
+
 # Filter options
 print("\nSelect age group for HRV filter bands:")
 print("1 = Youth (7–17 years) - LF: 0.04–0.15 Hz, HF: 0.15–0.40 Hz")
@@ -85,6 +110,8 @@ print(f"Acquisition folder: {acq_folder}")
 print(f"Output folder: {output_folder}")
 print(f"Segment time: {segment_time}")
 print(f"Maximum Number of Segments: {max_number_of_seg}")
+print(f"Run mode: {'Unattended' if unattended else 'Review' if review_mode else 'Attended'}")
+print(f"Pipelined segment checks: {pipelined_checks}")
 print(f"Age group: {group}")
 print(f"LF band: {lf_low}–{lf_high} Hz")
 print(f"HF band: {hf_low}–{hf_high} Hz")
@@ -92,13 +119,22 @@ print(f"HF band: {hf_low}–{hf_high} Hz")
 # %% ---------------------------------------------------------
 # Utility functions 
 # ------------------------------------------------------------
-pytesseract.pytesseract.tesseract_cmd = r'C:\Program Files\Tesseract-OCR\tesseract.exe' # This needs to be set based on the system as well
+# Tesseract paths are set in ocr_engine.py based on the system
+
+# Waiting for the operator; an unattended run cannot wait, so the step fails instead
+# (the workflow runner then restarts MindWare and resumes the file)
+def operator_pause(reason, prompt=""):
+    if unattended:
+        raise OperatorNeeded(reason)
+    with step("operator_pause", reason=reason), watchdog.paused():
+        input(prompt)
+
+# ------------------------------------------------------------
 
 # Checking whether the Channel Map window is set up correctly
 def verify_channel_map(expected_texts):
-    screenshot_path = "channel_map_check.png"
-    pyautogui.screenshot(screenshot_path, region=(806, 496, 1114, 673))  
-    extracted_text = pytesseract.image_to_string(Image.open(screenshot_path))
+    with step("ocr"):
+        extracted_text = read_text(grab((806, 496, 1114, 673), copy=False), whitelist=LETTERS_DIGITS)
     print("Extracted Channel Map Text:")
     print(extracted_text)
     for label, expected in expected_texts.items():
@@ -113,55 +149,178 @@ def verify_channel_map(expected_texts):
 def wait_and_click(image_path, confidence=0.9, timeout=15):
     start_time = time.time()
     while time.time() - start_time < timeout:
-        location = pyautogui.locateCenterOnScreen(image_path, confidence=confidence)
+        location = locate_template_center(image_path, confidence=confidence)
         if location:
-            pyautogui.click(location)
+            with input_lock:
+                pyautogui.click(location)
             print(f"Clicked {image_path}")
             return True
+        add_retry()
         time.sleep(0.5)
     # If not found then beep + wait for user
+    set_outcome("manual")
     winsound.MessageBeep()
     print(f"Could not find {image_path}. Please fix manually, then press ENTER to continue...")
-    input()
+    operator_pause(image_path)
     return False
 
 
 # ------------------------------------------------------------
-# Typing text
-def type_text(text, delay=0.1):
-    pyautogui.write(text, interval=delay)
+# Entering text: one paste, checked by read-back (or OCR of `region`);
+# typed key by key only if the check fails; the pop-up watcher does not click in between
+def enter_text(text, region=None):
+    with step("enter_text", chars=len(text)) as record, input_lock:
+        record["method"] = paste_and_verify(text, region=region)
 
 # ------------------------------------------------------------
 # Visual checker for detecting problematic R peaks
-def segment_has_yellow_peaks(region=(403, 274, 700, 128), threshold=0.0001):
-    time.sleep(1)
-    screenshot_path = "ecg_segment.png"
-    pyautogui.screenshot(screenshot_path, region=region)
-    img = Image.open(screenshot_path).convert("RGB")
-    yellow_count = 0
-    total_pixels = img.width * img.height
-    for r, g, b in img.getdata():
-        if r > 180 and g > 180 and b < 100:
-            yellow_count += 1
-    yellow_ratio = yellow_count / total_pixels
-    print(f"Yellow pixel ratio: {yellow_ratio:.6f}")
-    return yellow_ratio > threshold
+def segment_has_yellow_peaks(region=ECG_SEGMENT_REGION, threshold=YELLOW_RATIO_THRESHOLD):
+    return has_yellow_peaks(grab(region, copy=False), threshold=threshold)
+
+# ------------------------------------------------------------
+# Moving to the next segment and waiting until its plot is drawn; False if it did not change within `timeout`
+def next_segment(timeout=5):
+    previous_plot = grab_region(ECG_SEGMENT_REGION)
+    with input_lock:
+        pyautogui.click(x=458, y=206)
+    if wait_for_region_change(previous_plot, region=ECG_SEGMENT_REGION, timeout=timeout):
+        wait_for_region_stable(ECG_SEGMENT_REGION, timeout=5)
+        return True
+    return False
+
+# ------------------------------------------------------------
+# Longest redraw of a segment that is known to exist (large files are slow)
+SEGMENT_REDRAW_TIMEOUT = 30
+
+# Moving on to `segment`; False only at the end of a recording of unknown length.
+# With a known count an unchanged plot is a slow redraw, not the end: if it never
+# changes the state fails, so the file is not exported with segments left unchecked
+def advance_segment(segment, count_known):
+    if not count_known:
+        return next_segment()
+    if not next_segment(timeout=SEGMENT_REDRAW_TIMEOUT):
+        raise RuntimeError(f"Segment {segment} did not appear after {SEGMENT_REDRAW_TIMEOUT} s")
+    return True
+
+# ------------------------------------------------------------
+# Moving back one segment (arrow left of the next-segment arrow); False if the arrow
+# template (previous_segment_button.png, captured per installation) is missing or nothing changed
+def previous_segment():
+    try:
+        location = locate_template_center("previous_segment_button.png", confidence=0.9)
+    except FileNotFoundError:
+        return False
+    if location is None:
+        return False
+    previous_plot = grab_region(ECG_SEGMENT_REGION)
+    with input_lock:
+        pyautogui.click(location)
+    return wait_for_redraw(previous_plot, ECG_SEGMENT_REGION, timeout=5)
+
+# ------------------------------------------------------------
+# Opening Edit R's on the current segment and waiting for the operator
+def fix_segment_manually(segment):
+    wait_and_click("edit_rs_button.png")
+    time.sleep(2)
+    operator_pause(f"segment {segment} yellow peaks",
+                   ">>> Fix R-peaks manually, close the Edit window, then press Enter in the console two times to continue...")
+
+# ------------------------------------------------------------
+# Unattended check: flagged segments go to the review queue, nothing blocks
+def queue_flagged_segment(full_path, segment):
+    plot = grab(ECG_SEGMENT_REGION)
+    ratio = yellow_ratio(plot)
+    print(f"Yellow pixel ratio: {ratio:.6f}")
+    if ratio > YELLOW_RATIO_THRESHOLD:
+        review_queue.flag(full_path, segment, ratio, plot)
+        print("Yellow peaks detected. Segment queued for review.")
+    else:
+        print("Segment is clean. No action needed.")
+
+# ------------------------------------------------------------
+# Number of segments to check: recording length (file header) / segment time,
+# capped at the maximum; the maximum if the header cannot be read. Returns (count, count known)
+def segments_to_check(full_path, max_segments=max_number_of_seg):
+    n_segments = segment_count(full_path, segment_time)
+    if n_segments is None:
+        print(f"Segment count unknown, checking until the plot stops changing (max {max_segments})")
+        return max_segments, False
+    print(f"Recording has {n_segments} segments of {segment_time} s")
+    return min(n_segments, max_segments), True
 
 # ------------------------------------------------------------
 # Utility helper
-def check_all_segments(max_segments=max_number_of_seg):
+def check_all_segments(max_segments=max_number_of_seg, full_path=None, count_known=False):
     for i in range(max_segments):
         print(f"\nChecking segment {i+1}...")
-        if segment_has_yellow_peaks():
+        if unattended:
+            queue_flagged_segment(full_path, i + 1)
+        elif segment_has_yellow_peaks():
             print("Yellow peaks detected. Clicking 'Edit R’s'...")
             winsound.MessageBeep()
-            wait_and_click("edit_rs_button.png")
-            time.sleep(2)
-            input(">>> Fix R-peaks manually, close the Edit window, then press Enter in the console two times to continue...")
+            fix_segment_manually(i + 1)
         else:
             print("Segment is clean. No action needed.")
-        pyautogui.click(x=458, y=206)  
-        time.sleep(3)
+        # Stopping at the last segment (known count, or the plot did not change after "next")
+        if i + 1 == max_segments:
+            break
+        if not advance_segment(i + 2, count_known):
+            print("Last segment reached.")
+            break
+
+# ------------------------------------------------------------
+# Pipelined checks: capture, hand over to the classifier, move on; flagged segments are revisited at the end
+def check_all_segments_pipelined(max_segments=max_number_of_seg, full_path=None, count_known=False):
+    classifier = SegmentClassifier()
+    results, current = [], 1
+    for i in range(max_segments):
+        print(f"\nCapturing segment {i+1}...")
+        classifier.submit(i + 1, grab(ECG_SEGMENT_REGION))
+        for result in classifier.poll():
+            print(f"Segment {result.segment}: yellow pixel ratio {result.ratio:.6f}{' - flagged' if result.flagged else ''}")
+            results.append(result)
+        if i + 1 == max_segments:
+            break
+        if not advance_segment(i + 2, count_known):
+            print("Last segment reached.")
+            break
+        current += 1
+    results.extend(classifier.close())
+    flagged = sorted((result for result in results if result.flagged), key=lambda result: result.segment)
+    print(f"\n{len(flagged)} segments with yellow peaks: {[result.segment for result in flagged]}")
+
+    if unattended:
+        for result in flagged:
+            review_queue.flag(full_path, result.segment, result.ratio, result.image)
+        return
+
+    # Going back from the last segment, nearest flagged segment first
+    for result in sorted(flagged, key=lambda result: -result.segment):
+        while current > result.segment:
+            if not previous_segment():
+                # No way back on screen: the operator moves to the segment
+                winsound.MessageBeep()
+                operator_pause(f"go to segment {result.segment}",
+                               f">>> Go back to segment {result.segment} in MindWare, then press Enter in the console...")
+                current = result.segment
+                break
+            current -= 1
+        print(f"\nFixing segment {result.segment}...")
+        winsound.MessageBeep()
+        fix_segment_manually(result.segment)
+
+# ------------------------------------------------------------
+# Review session: going straight to the queued segments of one file
+def review_flagged_segments(flagged):
+    current = 1
+    for record in flagged:
+        # Queued segments exist, so a plot that does not change is never the end
+        while current < record["segment"]:
+            advance_segment(current + 1, count_known=True)
+            current += 1
+        print(f"\nReviewing segment {current} (yellow pixel ratio {record['yellow_ratio']:.6f}, thumbnail {record['thumbnail']})")
+        winsound.MessageBeep()
+        fix_segment_manually(current)
 
 # ------------------------------------------------------------
 # Safe Action (Error handling)
@@ -172,28 +331,29 @@ def safe_action(action_fn, *args, **kwargs):
     """
     try:
         return action_fn(*args, **kwargs)
+    except OperatorNeeded:
+        raise
     except Exception as e:
         winsound.MessageBeep()
         print(f"ERROR: {e}")
+        set_outcome("manual")
         print("Please fix the issue manually, then press ENTER in the console to continue...")
-        input()
+        operator_pause(repr(e))
         return None
 
 # %% ---------------------------------------------------------
 # Launching MindWare HRV software
 # ------------------------------------------------------------
-print("Starting MindWare HRV...")
-subprocess.Popen(mindware_path)
-time.sleep(25)
-
-# Force window to a known position
-try:
-    app_window = gw.getWindowsWithTitle("MindWare HRV Analysis")[0]
-    app_window.moveTo(0, 0)
-    app_window.resizeTo(1280, 800)
-    print("Window repositioned for consistent automation.")
-except Exception as e:
-    print("WARNING: Could not reposition window:", e)
+# Step timings of this run (summary: python step_trace.py summary <trace>)
+start_trace(os.path.join(output_folder, f"mindware_trace_{time.strftime('%Y%m%d-%H%M%S')}.jsonl"))
+
+# Pop-up watchers: dialogs such as "Continue" are dismissed whenever they appear
+popup_watcher = PopupWatcher().start()
+
+# Attaching to a running MindWare, launching it only if none is running
+with step("launch"):
+    app_window, cold_start = attach_or_launch(mindware_path)
+    annotate(cold_start=cold_start)
 
 # %% ---------------------------------------------------------
 # # Navigating through startup dialogs (specifically for the Demo Version)
@@ -218,180 +378,241 @@ if not files:
 # Print how many files were detected
 print(f" Found {len(files)} .acq files to process:")
 
+# Resume manifest: files exported by an earlier (or concurrent) run are skipped
+manifest = ResumeManifest(os.path.join(output_folder, "mindware_manifest.json"))
+
+# Review queue: segments flagged in unattended runs
+review_queue = ReviewQueue(output_folder)
+pending_reviews = review_queue.pending()
+if review_mode:
+    files = [f for f in files if os.path.abspath(os.path.join(acq_folder, f)) in pending_reviews]
+    print(f" {len(files)} files have segments to review")
+
+# Settings written in this MindWare session (rewritten only when they differ)
+settings_state = SettingsState()
+settings_target = {
+    "segment_time": segment_time,
+    "calculation": "Entire",
+    "lf_high": lf_high,
+    "hf_low": hf_low,
+    "hf_high": hf_high,
+    "output_folder": output_folder,
+}
+
+# Loading every button/field template once before the loop
+preload_templates([
+    "folder_path_field.png", "filename_field.png", "ok_channel_map.png", "add_button.png",
+    "event_ok.png", "continue_button.png", "segment_time_field.png", "hrv_calibration_tab.png",
+    "calculation_entire.png", "lf_field.png", "hf_field.png", "hf_field2.png", "rpeak_tab.png",
+    "additional_settings_tab.png", "use_default_directory.png", "folder_field.png",
+    "analyze_button.png", "edit_rs_button.png", "output_folder_field.png",
+])
+
 # %% ---------------------------------------------------------
-# Looping through each files and processing them 
+# Workflow states of one file
 # ------------------------------------------------------------
- 
-for acq_file_name in files:
-    full_path = os.path.join(acq_folder, acq_file_name)
-    print(f"\n Starting analysis for file: {acq_file_name}")
-    
-    # Clicking folder path field and typing the foldername
+
+# Opening the file (state: opened)
+def open_file(acq_file_name):
+    # Clicking folder path field and entering the foldername
     safe_action(wait_and_click, "folder_path_field.png")   
     time.sleep(1)
-    pyautogui.hotkey('ctrl', 'a')
-    time.sleep(0.5)
-    pyautogui.press('delete')
-    time.sleep(0.5)
-    type_text(acq_folder)  
-    time.sleep(1)
+    enter_text(acq_folder)
     pyautogui.press('enter')
-    
-    # Clicking filename field and typing the file name
+
+    # Clicking filename field and entering the file name
     safe_action(wait_and_click, "filename_field.png")     
     time.sleep(1)
-    pyautogui.hotkey('ctrl', 'a')
-    time.sleep(0.5)
-    pyautogui.press('delete')
-    time.sleep(0.5)
-    type_text(acq_file_name)  
-    time.sleep(1)
+    enter_text(acq_file_name)
     pyautogui.press('enter')
-    
     print("File opened successfully")
-    time.sleep(3)
 
-
-    # Confirming ECG channel selection
-    time.sleep(3)
+# ------------------------------------------------------------
+# Confirming ECG channel selection (state: channel-mapped); False if the Channel Map does not match
+def map_channels():
+    # Confirming ECG channel selection (once the Channel Map dialog is drawn)
+    wait_for_template("ok_channel_map.png", timeout=20)
+    wait_for_region_stable()
     expected_channels = {"ECG": "ECG", "Z0": "", "dZdt": "", "Resp": ""}
     if verify_channel_map(expected_channels):
+        before = grab_region()
         safe_action(wait_and_click, "ok_channel_map.png")
-        time.sleep(5)
-    else:
-        winsound.MessageBeep()
-        print(" Channel Map verification failed.")
+        wait_for_redraw(before)
+        return True
+
+    winsound.MessageBeep()
+    print(" Channel Map verification failed.")
+    if not unattended:
         print("Please refine the Channel Map manually, then press ENTER in the console to continue...")
-        input()
-    
-        safe_action(wait_and_click, "ok_channel_map.png", confidence=0.7)
-        time.sleep(5)
-        continue
+        operator_pause("channel map")
 
-    # Adding Digital Event Channel
+    before = grab_region()
+    safe_action(wait_and_click, "ok_channel_map.png", confidence=0.7)
+    wait_for_redraw(before)
+    set_outcome("failed")
+    return False
+
+# ------------------------------------------------------------
+# Adding Digital Event Channel (state: event-added)
+def add_event_channel():
     print("Adding Digital Event Channel...")
-    
+
+    before = grab_region()
     safe_action(wait_and_click, "add_button.png") # add_button for digital event
-    time.sleep(5)
-    
-    screenshot_path = "digital_event_check.png"
-    pyautogui.screenshot(screenshot_path, region=(791, 479, 1130, 642))
-    extracted_text = pytesseract.image_to_string(Image.open(screenshot_path))
+    wait_for_redraw(before)
+
+    with step("ocr"):
+        extracted_text = read_text(grab((791, 479, 1130, 642), copy=False), whitelist=LETTERS_DIGITS)
     print(extracted_text)
-    
+
     if "Event Channel" in extracted_text:
         print("Digital Event Channel already set.")
-
-        safe_action(wait_and_click, "event_ok.png")
-        time.sleep(2)
-        safe_action(wait_and_click, "event_ok.png")
-        time.sleep(5)
     else:
-
         winsound.MessageBeep()
         print("Digital Event Channel not set.")
         print("Please refine the Channel Map manually, then press ENTER in the console to continue...")
-        input()
-    
-        safe_action(wait_and_click, "event_ok.png")
-        time.sleep(2)
-        safe_action(wait_and_click, "event_ok.png")
-        time.sleep(5)
-    
-    # Handle possible pop-up (Continue button)
-    if safe_action(wait_and_click, "continue_button.png", timeout=5, confidence=0.6):
-        print("Pop-up detected: pressed Continue.")
-    else:
-        print("No pop-up detected, continuing workflow.")
-
-    # Setting Segment Time
-    safe_action(wait_and_click, "segment_time_field.png")
-    time.sleep(1)
-    pyautogui.doubleClick()
-    time.sleep(0.5)
-    type_text(str(segment_time))
-    pyautogui.press('enter')
-    print(f"Set segment time to {segment_time} seconds")
-    time.sleep(5)
-        
-    # HRV Calibration Settings
-    safe_action(wait_and_click, "hrv_calibration_tab.png")
-    time.sleep(1)
-    safe_action(wait_and_click, "calculation_entire.png")
-    time.sleep(1)
+        operator_pause("event channel")
 
-    safe_action(wait_and_click, "lf_field.png")
-    pyautogui.doubleClick()
-    type_text(str(lf_high))
-    pyautogui.press('enter')
-    print(f"Set LF upper Band filter to {lf_high} Hz")
-    time.sleep(5)
+    before = grab_region()
+    safe_action(wait_and_click, "event_ok.png")
+    wait_for_redraw(before)
+    before = grab_region()
+    safe_action(wait_and_click, "event_ok.png")
+    wait_for_redraw(before)
 
-    safe_action(wait_and_click, "hf_field.png")
-    pyautogui.doubleClick()
-    type_text(str(hf_low))
-    pyautogui.press('enter')
-    print(f"Set HF/RSA lower Band filter to {hf_low} Hz")
-    time.sleep(5)
+# ------------------------------------------------------------
+# Analysis settings (state: configured)
+def configure():
+    # Only the fields that differ from the target (one verification capture once they are set)
+    fields_to_write = settings_state.fields_to_write(settings_target)
+    annotate(written=sorted(fields_to_write))
+    if not fields_to_write:
+        print("Settings unchanged, nothing to write")
 
-    safe_action(wait_and_click, "hf_field2.png")
-    pyautogui.doubleClick()
-    type_text(str(hf_high))
-    pyautogui.press('enter')
-    print(f"Set HF/RSA upper Band filter to {hf_high} Hz")
-    time.sleep(5)
+    # Setting Segment Time
+    if "segment_time" in fields_to_write:
+        safe_action(wait_and_click, "segment_time_field.png")
+        time.sleep(1)
+        pyautogui.doubleClick()
+        enter_text(str(segment_time))
+        before = grab_region()
+        pyautogui.press('enter')
+        print(f"Set segment time to {segment_time} seconds")
+        wait_for_redraw(before)
     
-    # R peak and additional setting tabs 
-    safe_action(wait_and_click, "rpeak_tab.png")
-    time.sleep(1)
-    safe_action(wait_and_click, "additional_settings_tab.png")
-    time.sleep(1)
-    safe_action(wait_and_click, "use_default_directory.png")
-    safe_action(wait_and_click, "use_default_directory.png")
-    time.sleep(1)
-    safe_action(wait_and_click, "folder_field.png")
-    type_text(output_folder)
-    pyautogui.press('enter')
-    time.sleep(1)
-    pyautogui.press('enter')
-    print("Set output folder")
-    time.sleep(5)
+    # HRV Calibration Settings
+    if fields_to_write & {"calculation", "lf_high", "hf_low", "hf_high"}:
+        safe_action(wait_and_click, "hrv_calibration_tab.png")
+        time.sleep(1)
+        if "calculation" in fields_to_write:
+            safe_action(wait_and_click, "calculation_entire.png")
+            time.sleep(1)
+
+        if "lf_high" in fields_to_write:
+            safe_action(wait_and_click, "lf_field.png")
+            pyautogui.doubleClick()
+            enter_text(str(lf_high))
+            before = grab_region()
+            pyautogui.press('enter')
+            print(f"Set LF upper Band filter to {lf_high} Hz")
+            wait_for_redraw(before)
+
+        if "hf_low" in fields_to_write:
+            safe_action(wait_and_click, "hf_field.png")
+            pyautogui.doubleClick()
+            enter_text(str(hf_low))
+            before = grab_region()
+            pyautogui.press('enter')
+            print(f"Set HF/RSA lower Band filter to {hf_low} Hz")
+            wait_for_redraw(before)
+
+        if "hf_high" in fields_to_write:
+            safe_action(wait_and_click, "hf_field2.png")
+            pyautogui.doubleClick()
+            enter_text(str(hf_high))
+            before = grab_region()
+            pyautogui.press('enter')
+            print(f"Set HF/RSA upper Band filter to {hf_high} Hz")
+            wait_for_redraw(before)
 
+    # R peak and additional setting tabs 
+    if "output_folder" in fields_to_write:
+        safe_action(wait_and_click, "rpeak_tab.png")
+        time.sleep(1)
+        safe_action(wait_and_click, "additional_settings_tab.png")
+        time.sleep(1)
+        safe_action(wait_and_click, "use_default_directory.png")
+        safe_action(wait_and_click, "use_default_directory.png")
+        time.sleep(1)
+        safe_action(wait_and_click, "folder_field.png")
+        enter_text(output_folder)
+        pyautogui.press('enter')
+        time.sleep(1)
+        before = grab_region()
+        pyautogui.press('enter')
+        print("Set output folder")
+        wait_for_redraw(before)
+
+    settings_state.mark_applied(settings_target, fields_to_write)
 
-    # Running analysis  
+# ------------------------------------------------------------
+# Running analysis (state: analyzed)
+def analyze():
+    before = grab_region(ECG_SEGMENT_REGION)
     safe_action(wait_and_click, "analyze_button.png")
     print("Analysis started successfully")
+    # The first segment is drawn once the plot changed from the pre-click screen and settled
+    if not wait_for_redraw(before, ECG_SEGMENT_REGION, change_timeout=30, settle_time=1.0, timeout=30):
+        raise RuntimeError("Analyze view did not appear")
 
-    # segment checks
-    time.sleep(10)
-    check_all_segments()
+# ------------------------------------------------------------
+# Segment checks (state: reviewed)
+def check_segments(full_path):
+    # The first segment is already drawn (analyze waits for it)
+    if review_mode:
+        review_flagged_segments(pending_reviews[os.path.abspath(full_path)])
+    elif pipelined_checks:
+        max_segments, count_known = segments_to_check(full_path)
+        check_all_segments_pipelined(max_segments, full_path=full_path, count_known=count_known)
+    else:
+        max_segments, count_known = segments_to_check(full_path)
+        check_all_segments(max_segments, full_path=full_path, count_known=count_known)
 
+# ------------------------------------------------------------
+# Exporting results (state: exported); a missing export marks the file failed
+def export_results(full_path, acq_file_name):
     # Exporting results
     print("\nAll segments checked. Exporting results...")
+    export_started = time.time()
     pyautogui.hotkey('ctrl', 'shift', 'w')
-    time.sleep(6)
-    
+
     # Step A: Click into the folder path field
-    safe_action(wait_and_click, "output_folder_field.png")  
-    time.sleep(1)
-    
-    pyautogui.hotkey('ctrl', 'a')
-    time.sleep(0.5)
-    pyautogui.press('delete')
-    time.sleep(0.5)
-    
-    type_text(output_folder)  
+    safe_action(wait_and_click, "output_folder_field.png", timeout=20)  
     time.sleep(1)
 
+    enter_text(output_folder)
+
     pyautogui.press('enter')  
     time.sleep(1)
     pyautogui.press('enter')  
-    time.sleep(10)
-    
+
+    # Returns once the export exists and its size has settled
+    export_path = wait_for_export(output_folder, export_started, data_file=acq_file_name)
     pyautogui.press('enter')
 
-    print(f" Export complete for {acq_file_name}")
+    if export_path:
+        manifest.mark(full_path, EXPORTED, export_path=export_path, state=EXPORTED)
+        if review_mode:
+            review_queue.resolve(full_path, export_path)
+        print(f" Export complete for {acq_file_name}")
+    else:
+        manifest.mark(full_path, FAILED, error="No export found in output folder", state=REVIEWED)
+        set_outcome("failed")
+        print(f" WARNING: no export found for {acq_file_name}")
 
+# ------------------------------------------------------------
+# Leaving the file for the next one
+def close_file():
     # Exiting the Analyze window
     # Alt+F4+Fn
     pyautogui.hotkey('alt', 'fn', 'f4')
@@ -399,6 +620,68 @@ for acq_file_name in files:
 
     pyautogui.hotkey('ctrl', 'o')
     time.sleep(0.5)
-    
-    
+
+# ------------------------------------------------------------
+# Restarting a hung MindWare; its settings are gone with it
+def restart_session():
+    restart_mindware(mindware_path)
+    settings_state.reset()
+
+# ------------------------------------------------------------
+# Recording every completed state, so a later run can resume the file too
+# (the export step records its own outcome)
+def record_state(full_path, state):
+    if state != EXPORTED:
+        manifest.mark(full_path, IN_PROGRESS, state=state)
+
+# %% ---------------------------------------------------------
+# Looping through each files and processing them 
+# ------------------------------------------------------------
+
+# Watchdog: a hung MindWare or a stalled state restarts MindWare and resumes the file
+# (it also keeps the manifest claim of the current file fresh, so other runners leave it alone)
+watchdog = Watchdog(check_hung=lambda: mindware_problem(mindware_path),
+                    heartbeat=lambda: manifest.heartbeat(full_path), heartbeat_interval=HEARTBEAT_INTERVAL)
+watchdog.start()
+runner = WorkflowRunner(watchdog, restart_session, on_state=record_state)
+
+for acq_file_name in files:
+    full_path = os.path.join(acq_folder, acq_file_name)
+    # Files to review were already exported; they are re-exported after the fix
+    try:
+        claimed = review_mode or manifest.claim(full_path)
+    except TimeoutError as e:
+        print(f"\n Skipping {acq_file_name}: {e}")
+        continue
+    if not claimed:
+        print(f"\n Skipping {acq_file_name}: already exported or in progress in another run")
+        continue
+    print(f"\n Starting analysis for file: {acq_file_name}")
+    set_file(acq_file_name)
+
+    # Segment checks only survive a restart when their flags are in the review queue
+    steps = [
+        WorkflowStep(OPENED, "open_file", lambda: open_file(acq_file_name), True),
+        WorkflowStep(CHANNEL_MAPPED, "channel_map", map_channels, True),
+        WorkflowStep(EVENT_ADDED, "event_channel", add_event_channel, True),
+        WorkflowStep(CONFIGURED, "settings", configure, True),
+        WorkflowStep(ANALYZED, "analyze", analyze, True),
+        WorkflowStep(REVIEWED, "segment_checks", lambda: check_segments(full_path), not unattended),
+        WorkflowStep(EXPORTED, "export", lambda: export_results(full_path, acq_file_name), True),
+        WorkflowStep(None, "close_file", close_file, True),
+    ]
+    # Last completed state of an earlier run that stopped on this file
+    completed = None if review_mode else manifest.entry(full_path).get("state")
+    finished, completed, error = runner.run_file(full_path, steps, completed)
+    if not finished:
+        try:
+            manifest.mark(full_path, FAILED, error=error, state=completed)
+        except TimeoutError as e:
+            print(f" WARNING: could not record the failure: {e}")
+        print(f" WARNING: {acq_file_name} failed: {error}")
+
+popup_watcher.stop()
 print("\n All files processed. Workflow finished.")
+print(f" {len(popup_watcher.dismissed)} pop-ups dismissed")
+if unattended:
+    print(f" {len(review_queue.pending())} files have segments queued for review (run mode 3)")
@@ -11,6 +11,7 @@ import os
 import pygetwindow as gw   # For window management
 import pytesseract
 from PIL import Image
+from segment_qc import ECG_SEGMENT_REGION, YELLOW_RATIO_THRESHOLD, has_yellow_peaks
 
 
 # Defining MindWare HRV software path and acquisition file name
@@ -65,28 +66,14 @@ def type_text(text, delay=0.1):
     pyautogui.write(text, interval=delay)
 
 
-def segment_has_yellow_peaks(region=(403, 274, 700, 128), threshold=0.0001):
+def segment_has_yellow_peaks(region=ECG_SEGMENT_REGION, threshold=YELLOW_RATIO_THRESHOLD):
     """
     Checks if the ECG graph contains yellow R-peaks.
     Returns True if yellow pixels are detected above threshold.
     """
     time.sleep(1)  # allow UI to settle
-    screenshot_path = "ecg_segment.png"
-    pyautogui.screenshot(screenshot_path, region=region)
-    img = Image.open(screenshot_path).convert("RGB")
-
-    yellow_count = 0
-    total_pixels = img.width * img.height
-
-    for r, g, b in img.getdata():
-        # broader definition of yellow
-        if r > 180 and g > 180 and b < 100:  # stricter yellow
-            yellow_count += 1
-
-
-    yellow_ratio = yellow_count / total_pixels
-    print(f"Yellow pixel ratio: {yellow_ratio:.6f}")
-    return yellow_ratio > threshold
+    img = pyautogui.screenshot(region=region)
+    return has_yellow_peaks(img, threshold=threshold)
 
 
 def check_all_segments(max_segments=8):
@@ -0,0 +1,159 @@
+"""
+Last Update: 10/17/2026
+
+This code is for reading long, multi-channel AcqKnowledge (.acq) recordings
+(ECG plus Z0, dZdt, Resp, ...) without decoding the whole file into memory.
+The headers are parsed once (bioread), the interleaved sample block is
+memory-mapped, and each channel is exposed as a strided view or as a
+generator of fixed-length, overlapping chunks. Each chunk maps only its own
+window of the file, so peak memory does not grow with the recording length.
+
+Compressed .acq files cannot be memory-mapped; read them with bioread.read.
+"""
+
+# %% ---------------------------------------------------------
+# Importing libraries
+# ------------------------------------------------------------
+
+import os
+
+import bioread
+import numpy as np
+from bioread.data_reader import sample_pattern
+from bioread.reader import Reader
+
+# %% ---------------------------------------------------------
+# Recording
+# ------------------------------------------------------------
+
+class AcqRecording:
+    """
+    Memory-mapped view of the uncompressed data block of an .acq file.
+
+    Samples are stored as a repeating pattern of channel slots (channels with
+    a larger frequency divider appear less often). One repetition of the
+    pattern is one record of a structured dtype, so a channel that appears
+    once per pattern is a plain strided view of the mapped records.
+    Samples of a last, incomplete pattern repetition are not exposed.
+    """
+
+    def __init__(self, acq_path):
+        self.path = acq_path
+        with open(acq_path, "rb") as f:
+            reader = Reader.read_headers(f)
+        if reader.is_compressed:
+            raise ValueError(f"{os.path.basename(acq_path)} is compressed and cannot be memory-mapped")
+
+        self.channels = reader.datafile.channels
+        self.samples_per_second = reader.datafile.samples_per_second
+        self.data_start_offset = reader.data_start_offset
+
+        # One record = one repetition of the sample pattern
+        self._pattern = sample_pattern([c.frequency_divider for c in self.channels])
+        self.record_dtype = np.dtype([(f"s{slot}", self.channels[c].dtype)
+                                      for slot, c in enumerate(self._pattern)])
+        self._slots = [np.flatnonzero(self._pattern == c) for c in range(len(self.channels))]
+
+        available = (os.path.getsize(acq_path) - self.data_start_offset) // self.record_dtype.itemsize
+        complete = min(c.point_count // len(slots) for c, slots in zip(self.channels, self._slots))
+        self.n_records = int(min(available, complete))
+
+        self._records = None
+
+    # ------------------------------------------------------------
+    # Channel lookup
+    def channel_index(self, name):
+        for i, channel in enumerate(self.channels):
+            if name.lower() in channel.name.lower():
+                return i
+        raise ValueError(f"No channel named '{name}' in {os.path.basename(self.path)}")
+
+    def sample_count(self, channel):
+        return self.n_records * len(self._slots[channel])
+
+    def sampling_rate(self, channel):
+        return float(self.channels[channel].samples_per_second)
+
+    # Recording length in seconds (one record spans lcm(frequency dividers) base samples)
+    @property
+    def duration(self):
+        base_samples = np.lcm.reduce([c.frequency_divider for c in self.channels])
+        return self.n_records * int(base_samples) / self.samples_per_second
+
+    # ------------------------------------------------------------
+    # Mapping records (whole file once, or only a window of it)
+    def _map(self, first_record=0, n_records=None):
+        if n_records is None:
+            n_records = self.n_records - first_record
+        return np.memmap(self.path, dtype=self.record_dtype, mode="r",
+                         offset=self.data_start_offset + first_record * self.record_dtype.itemsize,
+                         shape=(n_records,))
+
+    def _scale(self, raw, channel):
+        info = self.channels[channel]
+        if raw.dtype.kind == "f":
+            return raw.astype(np.float64)
+        return raw * float(info.raw_scale_factor) + float(info.raw_offset)
+
+    # ------------------------------------------------------------
+    # Raw (unscaled) zero-copy view of a channel stored once per pattern
+    def raw_view(self, channel):
+        slots = self._slots[channel]
+        if len(slots) != 1:
+            raise ValueError("Channel appears more than once per sample pattern; use read() or chunks()")
+        if self._records is None:
+            self._records = self._map()
+        return self._records[f"s{slots[0]}"]
+
+    # ------------------------------------------------------------
+    # Scaled samples [start, stop) of one channel; only that window is mapped
+    def read(self, channel, start=0, stop=None):
+        per_record = len(self._slots[channel])
+        stop = self.sample_count(channel) if stop is None else min(stop, self.sample_count(channel))
+        if stop <= start:
+            return np.zeros(0)
+
+        first, last = start // per_record, -(-stop // per_record)
+        window = self._map(first, last - first)
+        if per_record == 1:
+            raw = window[f"s{self._slots[channel][0]}"]
+        else:
+            raw = np.column_stack([window[f"s{slot}"] for slot in self._slots[channel]]).ravel()
+        offset = start - first * per_record
+        samples = self._scale(raw[offset:offset + stop - start], channel)
+        del window
+        return samples
+
+    # ------------------------------------------------------------
+    # Fixed-length, overlapping chunks: yields (first sample index, samples)
+    def chunks(self, channel, chunk_size, overlap=0):
+        if not 0 <= overlap < chunk_size:
+            raise ValueError("overlap must be >= 0 and smaller than chunk_size")
+        total = self.sample_count(channel)
+        step = chunk_size - overlap
+        for start in range(0, max(total - overlap, 1), step):
+            yield start, self.read(channel, start, start + chunk_size)
+
+
+# %% ---------------------------------------------------------
+# Segments
+# ------------------------------------------------------------
+
+# Recording length in seconds from the headers only (works for compressed files too)
+def recording_duration(acq_path):
+    headers = bioread.read_headers(acq_path)
+    if headers is None or not headers.channels:
+        raise ValueError(f"No readable headers in {os.path.basename(acq_path)}")
+    return max(c.point_count / c.samples_per_second for c in headers.channels)
+
+
+# ------------------------------------------------------------
+# Number of segments MindWare shows for a segment time (the last one may be shorter);
+# None if the file has no readable .acq headers (e.g. .mwi)
+def segment_count(acq_path, segment_time):
+    try:
+        duration = recording_duration(acq_path)
+    except Exception:
+        return None
+    # Rounding guard: a recording of exactly N segments must not count N + 1
+    return max(int(np.ceil(duration / segment_time - 1e-6)), 1)
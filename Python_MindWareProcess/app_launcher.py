@@ -0,0 +1,161 @@
+"""
+Last Update: 10/17/2026
+
+This code is for starting the MindWare HRV session of a batch run: an
+existing "MindWare HRV Analysis" window (or a MindWare process that is still
+starting) is attached to, and MindWare is only launched when none is running.
+Readiness is detected by polling for the window and the template of the first
+screen instead of a fixed sleep, so repeated or chunked runs start right away.
+"""
+
+# %% ---------------------------------------------------------
+# Importing libraries
+# ------------------------------------------------------------
+
+import os
+import subprocess
+import time
+
+import pygetwindow as gw
+
+from ui_sync import WINDOW_REGION, WINDOW_TITLE, wait_for_region_stable, wait_for_template, wait_for_window
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+# %% ---------------------------------------------------------
+# Settings
+# ------------------------------------------------------------
+
+# First field clicked for every file: MindWare is ready once it is visible.
+# Captured per installation; without it only the region-stable wait is used
+READY_TEMPLATE = "folder_path_field.png"
+
+LAUNCH_TIMEOUT = 60
+READY_TIMEOUT = 60
+
+# Windows appends this to the title of a hung window
+NOT_RESPONDING = "(Not Responding)"
+
+# MindWare is only reported hung once every poll for this long saw the title (seconds);
+# it shows "(Not Responding)" for a few seconds while loading or analyzing a large file
+NOT_RESPONDING_GRACE = 30
+
+# %% ---------------------------------------------------------
+# Finding a running MindWare
+# ------------------------------------------------------------
+
+def find_window(title=WINDOW_TITLE):
+    windows = gw.getWindowsWithTitle(title)
+    return windows[0] if windows else None
+
+
+# ------------------------------------------------------------
+# Running MindWare process (same executable name); None if there is none or psutil is missing
+def find_process(mindware_path):
+    if psutil is None:
+        return None
+    exe_name = os.path.basename(mindware_path).lower()
+    for process in psutil.process_iter(["name"]):
+        if (process.info["name"] or "").lower() == exe_name:
+            return process
+    return None
+
+
+# %% ---------------------------------------------------------
+# Attaching / launching
+# ------------------------------------------------------------
+
+# Forcing the window to the position all screen coordinates assume
+def position_window(window, region=WINDOW_REGION):
+    try:
+        if window.isMinimized:
+            window.restore()
+        window.activate()
+        window.moveTo(region[0], region[1])
+        window.resizeTo(region[2], region[3])
+        print("Window repositioned for consistent automation.")
+    except Exception as e:
+        print("WARNING: Could not reposition window:", e)
+
+
+# ------------------------------------------------------------
+# Waiting until MindWare shows its first screen
+def wait_until_ready(timeout=READY_TIMEOUT, ready_template=READY_TEMPLATE):
+    try:
+        if wait_for_template(ready_template, timeout=timeout):
+            return True
+    except FileNotFoundError:
+        print(f"WARNING: template {ready_template} not found, waiting for the window to settle instead")
+    # Template not found (e.g. another dialog is open): at least wait until drawing stops
+    return wait_for_region_stable(timeout=10)
+
+
+# ------------------------------------------------------------
+# Existing window, else a starting process, else a cold launch; returns (window, launched)
+def attach_or_launch(mindware_path, title=WINDOW_TITLE, launch_timeout=LAUNCH_TIMEOUT):
+    window = find_window(title)
+    launched = False
+    if window is not None:
+        print("Attached to the running MindWare HRV window")
+    elif find_process(mindware_path) is not None:
+        print("MindWare HRV is starting, waiting for its window...")
+        window = wait_for_window(title, timeout=launch_timeout)
+    else:
+        print("Starting MindWare HRV...")
+        subprocess.Popen(mindware_path)
+        launched = True
+        window = wait_for_window(title, timeout=launch_timeout)
+
+    if window is None:
+        raise RuntimeError(f"No '{title}' window after {launch_timeout} s")
+    position_window(window)
+    wait_until_ready()
+    return window, launched
+
+
+# %% ---------------------------------------------------------
+# Health / restart
+# ------------------------------------------------------------
+
+# Current unbroken run of "(Not Responding)" polls: its first and latest poll time.
+# A gap longer than the grace (e.g. an operator pause) starts a new run
+_not_responding = {"since": None, "last": None}
+
+
+# Reason string if MindWare is hung or gone, None if it looks healthy
+def mindware_problem(mindware_path, title=WINDOW_TITLE, grace=NOT_RESPONDING_GRACE):
+    if any(NOT_RESPONDING in window.title for window in gw.getWindowsWithTitle(title)):
+        now = time.time()
+        if _not_responding["since"] is None or now - _not_responding["last"] > grace:
+            _not_responding["since"] = now
+        _not_responding["last"] = now
+        if now - _not_responding["since"] >= grace:
+            return f"MindWare is not responding (for {now - _not_responding['since']:.0f} s)"
+    else:
+        _not_responding["since"] = None
+    if psutil is not None and find_process(mindware_path) is None:
+        return "MindWare is not running"
+    return None
+
+
+# ------------------------------------------------------------
+# Closing MindWare for good (psutil, or taskkill without it)
+def close_mindware(mindware_path, timeout=15):
+    process = find_process(mindware_path)
+    if process is not None:
+        process.kill()
+        process.wait(timeout)
+    elif psutil is None:
+        subprocess.run(["taskkill", "/F", "/IM", os.path.basename(mindware_path)], capture_output=True)
+
+
+# ------------------------------------------------------------
+# Killing a hung MindWare and starting a fresh one; returns the new window
+def restart_mindware(mindware_path):
+    close_mindware(mindware_path)
+    _not_responding["since"] = None
+    window, _ = attach_or_launch(mindware_path)
+    return window
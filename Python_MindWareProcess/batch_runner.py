@@ -0,0 +1,95 @@
+"""
+Last Update: 10/17/2026
+
+This code is for running per-file Python analysis (e.g. hrv_engine.analyze_file)
+over the .acq/.mwi file list of an acquisition folder on all CPU cores.
+Files are fanned out over a process pool, results are streamed back as they
+finish, a failing file is reported and skipped (like safe_action) instead of
+stopping the batch, and only a bounded number of files is in flight at once.
+"""
+
+# %% ---------------------------------------------------------
+# Importing libraries
+# ------------------------------------------------------------
+
+import os
+import traceback
+from collections import namedtuple
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from functools import partial
+
+# %% ---------------------------------------------------------
+# Settings
+# ------------------------------------------------------------
+
+DATA_EXTENSIONS = (".acq", ".mwi")
+
+# Files submitted per worker before waiting for results (bounds memory of pending results)
+IN_FLIGHT_PER_WORKER = 2
+
+BatchResult = namedtuple("BatchResult", ["path", "result", "error"])
+
+# %% ---------------------------------------------------------
+# Files
+# ------------------------------------------------------------
+
+# Same file detection as the automation scripts
+def list_data_files(folder, extensions=DATA_EXTENSIONS):
+    return [os.path.join(folder, f) for f in sorted(os.listdir(folder)) if f.lower().endswith(extensions)]
+
+
+# %% ---------------------------------------------------------
+# Running
+# ------------------------------------------------------------
+
+# Runs in the worker: any error becomes part of the result, never an exception
+def _run_one(task, path):
+    try:
+        return BatchResult(path, task(path), None)
+    except Exception:
+        return BatchResult(path, None, traceback.format_exc())
+
+
+# ------------------------------------------------------------
+# Streaming BatchResult(path, result, error) for every file as it finishes
+def run_batch(files, task, workers=None, max_in_flight=None, **task_kwargs):
+    """
+    task must be a module-level function (it is pickled to the workers);
+    task_kwargs are passed to every call.
+    """
+    workers = workers or os.cpu_count() or 1
+    max_in_flight = max_in_flight or workers * IN_FLIGHT_PER_WORKER
+    if task_kwargs:
+        task = partial(task, **task_kwargs)
+
+    pending_files = iter(files)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        in_flight = set()
+        while True:
+            while len(in_flight) < max_in_flight:
+                path = next(pending_files, None)
+                if path is None:
+                    break
+                in_flight.add(pool.submit(_run_one, task, path))
+            if not in_flight:
+                return
+
+            done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield future.result()
+
+
+# ------------------------------------------------------------
+# Running a batch and printing progress; returns (results, failed paths)
+def run_batch_with_report(files, task, workers=None, **task_kwargs):
+    results, failed = [], []
+    total = len(files)
+    for i, item in enumerate(run_batch(files, task, workers=workers, **task_kwargs), start=1):
+        name = os.path.basename(item.path)
+        if item.error:
+            print(f"[{i}/{total}] ERROR: {name}\n{item.error}")
+            failed.append(item.path)
+        else:
+            print(f"[{i}/{total}] Processed file: {name}")
+            results.append(item)
+    return results, failed
@@ -0,0 +1,105 @@
+"""
+Last Update: 10/17/2026
+
+This code is for confirming that MindWare actually wrote the export (.xlsx)
+of a file after "Write All Segments": the output folder is watched
+(filesystem events through watchdog when it is installed, polling otherwise)
+and the export is returned as soon as it exists and its size has settled.
+A missing export is reported (None) instead of being skipped silently.
+"""
+
+# %% ---------------------------------------------------------
+# Importing libraries
+# ------------------------------------------------------------
+
+import os
+import threading
+import time
+
+try:
+    from watchdog.events import FileSystemEventHandler
+    from watchdog.observers import Observer
+except ImportError:
+    FileSystemEventHandler = object
+    Observer = None
+
+# %% ---------------------------------------------------------
+# Settings
+# ------------------------------------------------------------
+
+EXPORT_EXTENSION = ".xlsx"
+
+# The export is complete once its size did not change for this long (seconds)
+SETTLE_TIME = 0.3
+
+POLL_INTERVAL = 0.1
+EXPORT_TIMEOUT = 60
+
+# %% ---------------------------------------------------------
+# Watching the output folder
+# ------------------------------------------------------------
+
+class _ChangeFlag(FileSystemEventHandler):
+
+    def __init__(self):
+        self.changed = threading.Event()
+
+    def on_any_event(self, event):
+        self.changed.set()
+
+
+# ------------------------------------------------------------
+# Exports written since `since`; the ones named after the data file first
+def _new_exports(folder, since, stem=None):
+    exports = []
+    for name in os.listdir(folder):
+        path = os.path.join(folder, name)
+        if not name.lower().endswith(EXPORT_EXTENSION) or name.startswith("~$"):
+            continue
+        try:
+            if os.path.getmtime(path) >= since:
+                exports.append(path)
+        except FileNotFoundError:
+            continue
+    if stem:
+        named = [path for path in exports if os.path.basename(path).lower().startswith(stem.lower())]
+        exports = named or exports
+    return sorted(exports, key=os.path.getmtime, reverse=True)
+
+
+# ------------------------------------------------------------
+# Waiting for the export of one file; returns its path, or None on timeout
+def wait_for_export(folder, since, data_file=None, timeout=EXPORT_TIMEOUT, settle_time=SETTLE_TIME):
+    stem = os.path.splitext(os.path.basename(data_file))[0] if data_file else None
+    flag = _ChangeFlag()
+    observer = None
+    if Observer is not None:
+        observer = Observer()
+        observer.schedule(flag, folder, recursive=False)
+        observer.start()
+
+    start_time = time.time()
+    sizes = {}
+    try:
+        while time.time() - start_time < timeout:
+            flag.changed.clear()
+            for path in _new_exports(folder, since, stem):
+                try:
+                    size = os.path.getsize(path)
+                except FileNotFoundError:
+                    continue
+                last_size, stable_since = sizes.get(path, (None, None))
+                if size != last_size:
+                    sizes[path] = (size, time.time())
+                elif size > 0 and time.time() - stable_since >= settle_time:
+                    print(f"Export written after {time.time() - start_time:.1f} s: {os.path.basename(path)}")
+                    return path
+            # Woken by a folder event, or re-checking while a size settles / without watchdog
+            flag.changed.wait(POLL_INTERVAL if sizes or observer is None else 1.0)
+    finally:
+        if observer is not None:
+            observer.stop()
+            observer.join()
+
+    print(f"WARNING: no export in {folder} after {timeout} s")
+    return None
@@ -0,0 +1,154 @@
+"""
+Last Update: 10/17/2026
+
+This code is for computing the HRV metrics of AcqKnowledge (.acq) files
+directly in Python, with no MindWare GUI: the ECG channel is found, R peaks
+are detected, and for each segment of `segment_time` seconds the metrics
+that data_wrangling.R consumes are computed (mean HR, SDNN, RMSSD) together
+with LF/HF band power for the Youth/Adults/Children band presets.
+
+Usage:
+    python hrv_engine.py <acq_folder> [--segment-time 60] [--output hrv_segments.csv]
+                         [--spectrum welch|lomb] [--workers N]
+"""
+
+# %% ---------------------------------------------------------
+# Importing libraries
+# ------------------------------------------------------------
+
+import argparse
+import csv
+import os
+
+import bioread
+import numpy as np
+
+from acq_reader import AcqRecording
+from batch_runner import list_data_files, run_batch_with_report
+from rpeak_detect import detect_r_peaks
+from spectral_hrv import BAND_PRESETS, segment_band_powers
+
+# %% ---------------------------------------------------------
+# Settings
+# ------------------------------------------------------------
+
+SEGMENT_TIME = 60
+
+# Physiologically plausible inter-beat intervals (ms); others are treated as artifacts
+MIN_IBI_MS = 300
+MAX_IBI_MS = 2000
+
+# %% ---------------------------------------------------------
+# Reading .acq files
+# ------------------------------------------------------------
+
+# Index of the ECG channel (first channel whose name contains "ECG")
+def find_ecg_channel(channels):
+    for i, channel in enumerate(channels):
+        if "ecg" in channel.name.lower():
+            return i
+    raise ValueError("No ECG channel found")
+
+
+# ------------------------------------------------------------
+# Loading the ECG signal and its sampling rate from an .acq file
+# (memory-mapped, so the other channels are never decoded)
+def read_ecg(acq_path):
+    headers = bioread.read_headers(acq_path)
+    ecg_index = find_ecg_channel(headers.channels)
+    if not headers.is_compressed:
+        recording = AcqRecording(acq_path)
+        return recording.read(ecg_index), recording.sampling_rate(ecg_index)
+
+    datafile = bioread.read(acq_path, channel_indexes=[ecg_index])
+    channel = datafile.channels[ecg_index]
+    return np.asarray(channel.data, dtype=np.float64), float(channel.samples_per_second)
+
+
+# %% ---------------------------------------------------------
+# HRV metrics
+# ------------------------------------------------------------
+
+# Time-domain metrics of one segment's IBIs (ms)
+def time_domain_metrics(ibi_ms):
+    if len(ibi_ms) < 2:
+        return {"mean_hr": np.nan, "sdnn": np.nan, "rmssd": np.nan}
+    return {
+        "mean_hr": 60000.0 / np.mean(ibi_ms),
+        "sdnn": np.std(ibi_ms, ddof=1),
+        "rmssd": np.sqrt(np.mean(np.diff(ibi_ms) ** 2)),
+    }
+
+
+# ------------------------------------------------------------
+# Per-segment metrics of one ECG recording
+def analyze_ecg(ecg, fs, segment_time=SEGMENT_TIME, presets=BAND_PRESETS, spectrum="welch"):
+    peaks = detect_r_peaks(ecg, fs)
+    peak_times = peaks / fs
+    ibi_ms = np.diff(peak_times) * 1000
+    beat_times = peak_times[1:]
+    valid = (ibi_ms >= MIN_IBI_MS) & (ibi_ms <= MAX_IBI_MS)
+
+    n_segments = int(len(ecg) / fs // segment_time)
+    rows = []
+    for seg in range(n_segments):
+        start, end = seg * segment_time, (seg + 1) * segment_time
+        in_segment = valid & (beat_times >= start) & (beat_times < end)
+        seg_ibi, seg_times = ibi_ms[in_segment], beat_times[in_segment]
+
+        row = {"segment": seg + 1, "segment_start": start, "segment_duration": segment_time,
+               "n_rs_found": int(in_segment.sum())}
+        row.update(time_domain_metrics(seg_ibi))
+        row.update(segment_band_powers(seg_times, seg_ibi, presets=presets, method=spectrum))
+        rows.append(row)
+    return rows
+
+
+# ------------------------------------------------------------
+# Per-segment metrics of one .acq file
+def analyze_file(acq_path, segment_time=SEGMENT_TIME, presets=BAND_PRESETS, spectrum="welch"):
+    ecg, fs = read_ecg(acq_path)
+    rows = analyze_ecg(ecg, fs, segment_time=segment_time, presets=presets, spectrum=spectrum)
+    for row in rows:
+        row["source_file"] = os.path.basename(acq_path)
+    return rows
+
+
+# %% ---------------------------------------------------------
+# Whole study
+# ------------------------------------------------------------
+
+def write_rows(rows, output_path):
+    if not rows:
+        return
+    fields = ["source_file"] + [k for k in rows[0] if k != "source_file"]
+    with open(output_path, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=fields)
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Headless HRV analysis of .acq files")
+    parser.add_argument("acq_folder")
+    parser.add_argument("--segment-time", type=int, default=SEGMENT_TIME)
+    parser.add_argument("--output", default="hrv_segments.csv")
+    parser.add_argument("--spectrum", choices=["welch", "lomb"], default="welch")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: all cores)")
+    args = parser.parse_args()
+
+    files = list_data_files(args.acq_folder, extensions=(".acq",))
+    print(f" Found {len(files)} .acq files to process")
+
+    results, failed = run_batch_with_report(files, analyze_file, workers=args.workers,
+                                            segment_time=args.segment_time, spectrum=args.spectrum)
+    all_rows = [row for item in results for row in item.result]
+    if failed:
+        print(f"{len(failed)} files failed")
+
+    write_rows(all_rows, args.output)
+    print(f"Saved {len(all_rows)} segment rows to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
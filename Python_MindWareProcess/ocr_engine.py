@@ -0,0 +1,125 @@
+"""
+Last Update: 10/17/2026
+
+This code is for reading text from the small MindWare dialog regions
+(Channel Map, Digital Event Channel, settings fields).
+One Tesseract engine is kept warm in-process (tesserocr) and is fed
+in-memory arrays; when tesserocr is not installed, pytesseract is used.
+Results are memoized by an exact content hash of the region, so a dialog
+that is pixel-identical to one already read skips OCR entirely.
+"""
+
+# %% ---------------------------------------------------------
+# Importing libraries
+# ------------------------------------------------------------
+
+import hashlib
+
+import numpy as np
+from PIL import Image
+
+try:
+    import tesserocr
+except ImportError:
+    tesserocr = None
+import pytesseract
+
+# %% ---------------------------------------------------------
+# Settings
+# ------------------------------------------------------------
+
+# These need to be set based on the system
+TESSERACT_CMD = r"C:\Program Files\Tesseract-OCR\tesseract.exe"
+TESSDATA_PATH = r"C:\Program Files\Tesseract-OCR\tessdata"
+LANGUAGE = "eng"
+
+pytesseract.pytesseract.tesseract_cmd = TESSERACT_CMD
+
+# Page segmentation modes that fit the dialog regions
+PSM_SINGLE_BLOCK = 6
+PSM_SINGLE_LINE = 7
+
+# Character whitelists
+LETTERS_DIGITS = "ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789 "
+NUMBERS = "0123456789."
+
+MAX_CACHED_RESULTS = 256
+
+# %% ---------------------------------------------------------
+# Content hash
+# ------------------------------------------------------------
+
+# Exact hash of a region (pixels, shape, dtype): regions differing in one digit never share a key
+def image_hash(image):
+    array = np.ascontiguousarray(np.asarray(image))
+    digest = hashlib.blake2b(array.tobytes(), digest_size=16)
+    digest.update(repr((array.shape, array.dtype.str)).encode())
+    return digest.hexdigest()
+
+
+# %% ---------------------------------------------------------
+# OCR engine
+# ------------------------------------------------------------
+
+class OcrEngine:
+    """
+    Warm OCR engine with a result cache keyed by (image hash, whitelist, psm).
+    """
+
+    def __init__(self, tessdata_path=TESSDATA_PATH, language=LANGUAGE):
+        self._api = None
+        if tesserocr is not None:
+            self._api = tesserocr.PyTessBaseAPI(path=tessdata_path, lang=language)
+        self.language = language
+        self._cache = {}
+        self.hits = 0
+        self.misses = 0
+
+    def _recognize(self, image, whitelist, psm):
+        if self._api is not None:
+            self._api.SetPageSegMode(psm)
+            self._api.SetVariable("tessedit_char_whitelist", whitelist or "")
+            self._api.SetImage(image)
+            return self._api.GetUTF8Text()
+
+        config = f"--psm {psm}"
+        if whitelist:
+            # Spaces cannot be passed on the command line; Tesseract keeps word gaps anyway
+            config += f" -c tessedit_char_whitelist={whitelist.replace(' ', '')}"
+        return pytesseract.image_to_string(image, lang=self.language, config=config)
+
+    # cache=False: always recognized (verification reads must never see an earlier result)
+    def read_text(self, image, whitelist=None, psm=PSM_SINGLE_BLOCK, cache=True):
+        array = np.asarray(image)
+        key = (image_hash(array), whitelist, psm)
+        if cache and key in self._cache:
+            self.hits += 1
+            return self._cache[key]
+
+        self.misses += 1
+        text = self._recognize(Image.fromarray(array), whitelist, psm)
+        if len(self._cache) >= MAX_CACHED_RESULTS:
+            self._cache.pop(next(iter(self._cache)))
+        self._cache[key] = text
+        return text
+
+    def close(self):
+        if self._api is not None:
+            self._api.End()
+            self._api = None
+
+
+_engine = None
+
+
+# ------------------------------------------------------------
+# One engine per process, created on first use
+def get_engine():
+    global _engine
+    if _engine is None:
+        _engine = OcrEngine()
+    return _engine
+
+
+def read_text(image, whitelist=None, psm=PSM_SINGLE_BLOCK, cache=True):
+    return get_engine().read_text(image, whitelist=whitelist, psm=psm, cache=cache)
@@ -0,0 +1,172 @@
+"""
+Last Update: 10/17/2026
+
+This code is for dismissing MindWare HRV pop-ups (e.g. the "Continue"
+dialog) as soon as they appear, instead of probing for them with a 5 s
+timeout after the event-channel step. An asyncio event loop in a background
+thread runs one watcher task per known pop-up; every scan grabs one frame of
+the window, all watchers match against that same frame, and a watcher clicks
+its button as soon as it is found.
+"""
+
+# %% ---------------------------------------------------------
+# Importing libraries
+# ------------------------------------------------------------
+
+import asyncio
+import threading
+import time
+
+import pyautogui
+
+from screen_capture import WINDOW_REGION, create_backend, invalidate_shared_frame
+from template_cache import match_template
+
+# %% ---------------------------------------------------------
+# Settings
+# ------------------------------------------------------------
+
+# Known pop-ups: template of the button that dismisses it -> (match confidence, dialog region).
+# Only the dialog region is searched, with a strict confidence, so nothing else is clicked;
+# the Continue button shows up around (966, 636) (see MindwareAutoProccess.py)
+POPUPS = {
+    "continue_button.png": (0.9, (766, 536, 400, 200)),
+}
+
+SCAN_INTERVAL = 0.25
+
+# Held around every click / key press of the driver and of the watchers,
+# so a pop-up is never clicked in the middle of a paste or typed text
+input_lock = threading.RLock()
+
+# A button clicked this recently is not clicked again while its dialog closes (seconds)
+DISMISS_COOLDOWN = 1.0
+
+# %% ---------------------------------------------------------
+# Shared frames
+# ------------------------------------------------------------
+
+class FrameFeed:
+    """
+    Grabs the window once per scan and hands the same frame to every
+    watcher task waiting for the next one.
+    """
+
+    def __init__(self, backend, region=WINDOW_REGION, interval=SCAN_INTERVAL):
+        self.backend = backend
+        self.region = region
+        self.interval = interval
+        self.frame = None
+        self.sequence = 0
+        self._new_frame = asyncio.Condition()
+
+    async def run(self):
+        while True:
+            try:
+                # Copied: the backend buffer is reused by the next grab
+                frame = self.backend.grab(self.region).copy()
+            except Exception as e:
+                # A failed grab must not end the feed: every watcher waits on it
+                print(f"WARNING: pop-up watcher could not capture the window: {e}")
+                await asyncio.sleep(max(self.interval, DISMISS_COOLDOWN))
+                continue
+            async with self._new_frame:
+                self.frame = frame
+                self.sequence += 1
+                self._new_frame.notify_all()
+            await asyncio.sleep(self.interval)
+
+    # ------------------------------------------------------------
+    # Waiting for a frame newer than `after`; returns (sequence, frame)
+    async def next_frame(self, after):
+        async with self._new_frame:
+            await self._new_frame.wait_for(lambda: self.sequence > after)
+            return self.sequence, self.frame
+
+
+# %% ---------------------------------------------------------
+# Watchers
+# ------------------------------------------------------------
+
+class PopupWatcher(threading.Thread):
+    """
+    Runs the pop-up watchers next to the (blocking) workflow on the main
+    thread. dismissed: (template, time) of every click, for the run summary.
+    popups: {template: (confidence, region)}, regions in screen coordinates
+    inside `region`.
+    """
+
+    def __init__(self, popups=POPUPS, region=WINDOW_REGION, interval=SCAN_INTERVAL):
+        super().__init__(name="mindware-popups", daemon=True)
+        self.popups = dict(popups)
+        self.region = region
+        self.interval = interval
+        self.dismissed = []
+        self._loop = None
+        self._stop_event = None
+        self._started = threading.Event()
+
+    def run(self):
+        asyncio.run(self._watch_all())
+
+    async def _watch_all(self):
+        self._loop = asyncio.get_running_loop()
+        self._stop_event = asyncio.Event()
+        # Own capture backend: the main thread keeps using the shared one
+        feed = FrameFeed(create_backend(), self.region, self.interval)
+        tasks = [asyncio.create_task(feed.run())]
+        tasks += [asyncio.create_task(self._watch(feed, template, confidence, dialog_region))
+                  for template, (confidence, dialog_region) in self.popups.items()]
+        self._started.set()
+
+        await self._stop_event.wait()
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    # ------------------------------------------------------------
+    # One pop-up: clicking its button whenever it shows up in its dialog region of a frame
+    async def _watch(self, feed, template, confidence, dialog_region):
+        left = dialog_region[0] - self.region[0]
+        top = dialog_region[1] - self.region[1]
+        sequence = 0
+        last_click = 0.0
+        while True:
+            sequence, frame = await feed.next_frame(sequence)
+            if time.time() - last_click < DISMISS_COOLDOWN:
+                continue
+            try:
+                dialog = frame[top:top + dialog_region[3], left:left + dialog_region[2]]
+                box = match_template(template, dialog, confidence)
+                if box is None:
+                    continue
+                x = dialog_region[0] + box[0] + box[2] // 2
+                y = dialog_region[1] + box[1] + box[3] // 2
+                with input_lock:
+                    pyautogui.click(x, y)
+            except FileNotFoundError:
+                print(f"WARNING: template {template} not found, pop-up not watched")
+                return
+            except Exception as e:
+                # A failed scan or click must not end the watcher (e.g. fail-safe corner)
+                print(f"WARNING: pop-up watcher for {template}: {e}")
+                await asyncio.sleep(DISMISS_COOLDOWN)
+                continue
+
+            last_click = time.time()
+            self.dismissed.append((template, last_click))
+            # The main thread must not reuse a frame that still shows the pop-up
+            invalidate_shared_frame()
+            print(f"Pop-up dismissed: {template}")
+
+    # ------------------------------------------------------------
+    # Starting the watchers and waiting until they are scanning
+    def start(self):
+        super().start()
+        self._started.wait(5)
+        return self
+
+    def stop(self, timeout=5):
+        if self._loop is not None and self._stop_event is not None:
+            self._loop.call_soon_threadsafe(self._stop_event.set)
+        self.join(timeout)
@@ -0,0 +1,239 @@
+"""
+Last Update: 10/17/2026
+
+This code is for resuming a batch run after MindWare hangs or the script dies:
+a durable JSON manifest records the status of every data file
+(pending, in-progress, exported, failed) and its export path, keyed by the
+file path, size and content hash. Finished files are skipped on the next run.
+
+Every update is a read-modify-write under a lock file and is written
+atomically (temporary file + os.replace), so the manifest survives crashes
+and can be shared by several runners working on the same folder. A runner
+refreshes its claim (heartbeat) while it works on a file; a claim without
+heartbeats, or of a runner process that is gone, is taken over.
+"""
+
+# %% ---------------------------------------------------------
+# Importing libraries
+# ------------------------------------------------------------
+
+import hashlib
+import json
+import os
+import socket
+import time
+from contextlib import contextmanager
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+# %% ---------------------------------------------------------
+# Settings
+# ------------------------------------------------------------
+
+PENDING = "pending"
+IN_PROGRESS = "in-progress"
+EXPORTED = "exported"
+FAILED = "failed"
+
+# A lock file older than this (seconds) is left over from a dead runner
+STALE_LOCK_AGE = 60
+
+# Waiting for the lock outlasts STALE_LOCK_AGE, so a leftover lock is always broken
+LOCK_TIMEOUT = STALE_LOCK_AGE + 30
+
+# Runners refresh their claim (heartbeat) this often while working on a file (seconds)
+HEARTBEAT_INTERVAL = 60
+
+# An in-progress claim without a heartbeat for this long (seconds) is treated as abandoned
+STALE_CLAIM_AGE = 5 * HEARTBEAT_INTERVAL
+
+HASH_CHUNK_SIZE = 1024 * 1024
+
+# %% ---------------------------------------------------------
+# File identity
+# ------------------------------------------------------------
+
+def file_hash(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+# ------------------------------------------------------------
+# Manifest key: path, size and content hash (hash reused while size/mtime are unchanged)
+def file_key(path, entries=None):
+    path = os.path.abspath(path)
+    stat = os.stat(path)
+    for entry in (entries or {}).values():
+        if entry["path"] == path and entry["size"] == stat.st_size and entry.get("mtime") == stat.st_mtime:
+            return f"{path}|{stat.st_size}|{entry['hash']}", entry["hash"]
+    content_hash = file_hash(path)
+    return f"{path}|{stat.st_size}|{content_hash}", content_hash
+
+
+# ------------------------------------------------------------
+# Whether the runner that claimed a file is still working on it
+def _runner_alive(runner, updated_at):
+    if time.time() - updated_at > STALE_CLAIM_AGE:
+        return False
+    host, _, pid = runner.rpartition(":")
+    if host != socket.gethostname():
+        return True
+    # Same machine: a rerun after a crash takes the file back right away; without
+    # psutil the runner cannot be checked, so its claim holds until heartbeats stop
+    if psutil is None:
+        return True
+    return psutil.pid_exists(int(pid))
+
+
+# %% ---------------------------------------------------------
+# Manifest
+# ------------------------------------------------------------
+
+class ResumeManifest:
+
+    def __init__(self, manifest_path):
+        self.manifest_path = manifest_path
+        self.lock_path = manifest_path + ".lock"
+        self.runner_id = f"{socket.gethostname()}:{os.getpid()}"
+
+    # ------------------------------------------------------------
+    # Whether the lock file was left by a runner on this machine that is gone
+    def _lock_holder_dead(self):
+        try:
+            with open(self.lock_path, encoding="utf-8") as f:
+                holder = f.read()
+        except OSError:
+            return False
+        host, _, pid = holder.rpartition(":")
+        return (host == socket.gethostname() and pid.isdigit()
+                and psutil is not None and not psutil.pid_exists(int(pid)))
+
+    # ------------------------------------------------------------
+    # Lock file shared by every runner (O_EXCL create is atomic)
+    @contextmanager
+    def _locked(self, timeout=LOCK_TIMEOUT):
+        start_time = time.time()
+        while True:
+            try:
+                fd = os.open(self.lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+                os.write(fd, self.runner_id.encode())
+                os.close(fd)
+                break
+            except FileExistsError:
+                try:
+                    if (time.time() - os.path.getmtime(self.lock_path) > STALE_LOCK_AGE
+                            or self._lock_holder_dead()):
+                        os.remove(self.lock_path)
+                        continue
+                except FileNotFoundError:
+                    continue
+                if time.time() - start_time > timeout:
+                    raise TimeoutError(f"Could not lock {self.manifest_path}")
+                time.sleep(0.1)
+        try:
+            yield
+        finally:
+            os.remove(self.lock_path)
+
+    def _read(self):
+        try:
+            with open(self.manifest_path, encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+
+    def _write(self, entries):
+        tmp_path = f"{self.manifest_path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(entries, f, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.manifest_path)
+
+    # ------------------------------------------------------------
+    # Reading the status of a file without changing anything
+    def status(self, path):
+        entries = self._read()
+        key, _ = file_key(path, entries)
+        return entries.get(key, {}).get("status", PENDING)
+
+    def entries(self):
+        return list(self._read().values())
+
+    # Manifest entry of a file ({} if it has none)
+    def entry(self, path):
+        entries = self._read()
+        key, _ = file_key(path, entries)
+        return entries.get(key, {})
+
+    # ------------------------------------------------------------
+    # Refreshing this runner's claim on a file, so other runners do not take it over
+    def heartbeat(self, path):
+        key, _ = file_key(path, self._read())
+        with self._locked():
+            entries = self._read()
+            entry = entries.get(key)
+            if entry is None or entry.get("status") != IN_PROGRESS or entry.get("runner") != self.runner_id:
+                return
+            entry["updated_at"] = time.time()
+            self._write(entries)
+
+    # ------------------------------------------------------------
+    # Recording a status (and the last completed workflow state) for a file
+    def mark(self, path, status, export_path=None, error=None, state=None):
+        # Hashing happens before locking, so other runners are not blocked by it
+        key, content_hash = file_key(path, self._read())
+        with self._locked():
+            entries = self._read()
+            entry = entries.get(key, {})
+            entry.update({
+                "path": os.path.abspath(path),
+                "size": os.path.getsize(path),
+                "mtime": os.path.getmtime(path),
+                "hash": content_hash,
+                "status": status,
+                "runner": self.runner_id,
+                "updated_at": time.time(),
+            })
+            if export_path is not None:
+                entry["export_path"] = export_path
+            if state is not None:
+                entry["state"] = state
+            entry["error"] = error
+            entries[key] = entry
+            self._write(entries)
+
+    # ------------------------------------------------------------
+    # Claiming a file for this runner; False if it is finished or claimed by another runner
+    def claim(self, path):
+        # Hashing happens before locking, so other runners are not blocked by it
+        key, content_hash = file_key(path, self._read())
+        with self._locked():
+            entries = self._read()
+            entry = entries.get(key, {})
+            status = entry.get("status", PENDING)
+            if status == EXPORTED:
+                return False
+            runner = entry.get("runner", self.runner_id)
+            if status == IN_PROGRESS and runner != self.runner_id and _runner_alive(runner, entry["updated_at"]):
+                return False
+
+            entry.update({
+                "path": os.path.abspath(path),
+                "size": os.path.getsize(path),
+                "mtime": os.path.getmtime(path),
+                "hash": content_hash,
+                "status": IN_PROGRESS,
+                "runner": self.runner_id,
+                "updated_at": time.time(),
+                "error": None,
+            })
+            entries[key] = entry
+            self._write(entries)
+            return True
@@ -0,0 +1,103 @@
+"""
+Last Update: 10/17/2026
+
+This code is for reviewing flagged segments after an unattended run instead of
+stopping the batch at every segment with yellow (problematic) R peaks.
+Each flagged segment (file, segment number, yellow ratio, thumbnail of the
+ECG plot) is appended to a review queue in the output folder; a review session
+later reopens only the affected files and goes straight to those segments.
+
+The queue is an append-only JSON-lines file: a "flagged" line per segment and a
+"reviewed" line once a file has been fixed and re-exported, so several runners
+can write to it and an interrupted run never corrupts it.
+"""
+
+# %% ---------------------------------------------------------
+# Importing libraries
+# ------------------------------------------------------------
+
+import json
+import os
+import re
+import time
+
+from PIL import Image
+
+# %% ---------------------------------------------------------
+# Settings
+# ------------------------------------------------------------
+
+REVIEW_QUEUE_NAME = "review_queue.jsonl"
+THUMBNAIL_DIR = "review_thumbnails"
+
+# Thumbnails are the ECG plot scaled to half size
+THUMBNAIL_SCALE = 0.5
+
+FLAGGED = "flagged"
+REVIEWED = "reviewed"
+
+# %% ---------------------------------------------------------
+# Review queue
+# ------------------------------------------------------------
+
+class ReviewQueue:
+
+    def __init__(self, output_folder):
+        self.queue_path = os.path.join(output_folder, REVIEW_QUEUE_NAME)
+        self.thumbnail_dir = os.path.join(output_folder, THUMBNAIL_DIR)
+
+    # One line per event; O_APPEND keeps lines of concurrent runners whole
+    def _append(self, record):
+        with open(self.queue_path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record) + "\n")
+
+    def records(self):
+        try:
+            with open(self.queue_path, encoding="utf-8") as f:
+                return [json.loads(line) for line in f if line.strip()]
+        except FileNotFoundError:
+            return []
+
+    # ------------------------------------------------------------
+    # Saving the ECG plot of a flagged segment
+    def _save_thumbnail(self, full_path, segment, image):
+        os.makedirs(self.thumbnail_dir, exist_ok=True)
+        stem = re.sub(r"[^\w.-]", "_", os.path.splitext(os.path.basename(full_path))[0])
+        thumbnail_path = os.path.join(self.thumbnail_dir, f"{stem}_seg{segment}.png")
+        thumbnail = Image.fromarray(image)
+        size = (max(int(thumbnail.width * THUMBNAIL_SCALE), 1), max(int(thumbnail.height * THUMBNAIL_SCALE), 1))
+        thumbnail.resize(size).save(thumbnail_path)
+        return thumbnail_path
+
+    # ------------------------------------------------------------
+    # Recording a segment with yellow peaks (segment numbers start at 1)
+    def flag(self, full_path, segment, ratio, image=None):
+        record = {
+            "event": FLAGGED,
+            "path": os.path.abspath(full_path),
+            "file": os.path.basename(full_path),
+            "segment": segment,
+            "yellow_ratio": ratio,
+            "thumbnail": self._save_thumbnail(full_path, segment, image) if image is not None else None,
+            "at": time.time(),
+        }
+        self._append(record)
+        return record
+
+    # ------------------------------------------------------------
+    # Marking every flagged segment of a file as fixed
+    def resolve(self, full_path, export_path=None):
+        self._append({"event": REVIEWED, "path": os.path.abspath(full_path),
+                      "export_path": export_path, "at": time.time()})
+
+    # ------------------------------------------------------------
+    # Files still to review: {path: sorted flagged segment records}
+    def pending(self):
+        flagged = {}
+        for record in self.records():
+            if record["event"] == REVIEWED:
+                flagged.pop(record["path"], None)
+            else:
+                segments = flagged.setdefault(record["path"], {})
+                segments[record["segment"]] = record
+        return {path: [segments[n] for n in sorted(segments)] for path, segments in flagged.items()}
@@ -0,0 +1,137 @@
+"""
+Last Update: 10/17/2026
+
+This code is for detecting R peaks in an ECG recording with a vectorized
+Pan-Tompkins-style detector: band-pass, derivative, squaring, moving-window
+integration and an adaptive threshold. It runs over a whole recording (or a
+batch of segments) at once and returns sample indices as an int32 array.
+"""
+
+# %% ---------------------------------------------------------
+# Importing libraries
+# ------------------------------------------------------------
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+from scipy import signal
+
+# %% ---------------------------------------------------------
+# Settings
+# ------------------------------------------------------------
+
+BANDPASS_HZ = (5.0, 15.0)
+INTEGRATION_WINDOW_S = 0.150
+REFRACTORY_S = 0.200
+
+# Candidate peaks used for the local signal/noise levels of the adaptive threshold
+THRESHOLD_NEIGHBOURS = 16
+
+# An RR gap longer than this times the median RR triggers a search-back
+SEARCH_BACK_RR = 1.66
+
+# %% ---------------------------------------------------------
+# Pan-Tompkins stages
+# ------------------------------------------------------------
+
+# Band-pass, derivative, squaring and moving-window integration
+def pan_tompkins_signals(ecg, fs):
+    sos = signal.butter(2, BANDPASS_HZ, btype="band", fs=fs, output="sos")
+    filtered = signal.sosfiltfilt(sos, np.asarray(ecg, dtype=np.float64))
+
+    # Five-point derivative: (-x[n-2] - 2x[n-1] + 2x[n+1] + x[n+2]) / 8
+    derivative = np.convolve(filtered, np.array([1, 2, 0, -2, -1]) * (fs / 8.0), mode="same")
+
+    window = max(int(INTEGRATION_WINDOW_S * fs), 1)
+    cumulative = np.cumsum(np.concatenate(([0.0], derivative ** 2)))
+    integrated = np.empty_like(filtered)
+    integrated[window - 1:] = (cumulative[window:] - cumulative[:-window]) / window
+    integrated[:window - 1] = cumulative[1:window] / window
+    return filtered, integrated
+
+
+# ------------------------------------------------------------
+# Adaptive threshold of every candidate from its neighbouring candidates:
+# noise level + 0.25 * (signal level - noise level), as in Pan-Tompkins
+def adaptive_thresholds(heights, neighbours=THRESHOLD_NEIGHBOURS):
+    if len(heights) == 0:
+        return heights
+    half = neighbours // 2
+    padded = np.pad(heights, (half, neighbours - half), mode="edge")
+    windows = sliding_window_view(padded, neighbours + 1)[:len(heights)]
+    signal_level = np.percentile(windows, 90, axis=1)
+    noise_level = np.median(windows, axis=1)
+    return noise_level + 0.25 * (signal_level - noise_level)
+
+
+# ------------------------------------------------------------
+# Adding the strongest candidate inside every RR gap that is too long
+def search_back(beats, candidates, heights, thresholds):
+    if len(beats) < 3:
+        return beats
+    rr = np.diff(candidates[beats])
+    long_gaps = np.flatnonzero(rr > SEARCH_BACK_RR * np.median(rr))
+    if len(long_gaps) == 0:
+        return beats
+
+    recovered = []
+    for gap in long_gaps:
+        inside = np.arange(beats[gap] + 1, beats[gap + 1])
+        inside = inside[heights[inside] > 0.5 * thresholds[inside]]
+        if len(inside):
+            recovered.append(inside[np.argmax(heights[inside])])
+    return np.union1d(beats, np.array(recovered, dtype=beats.dtype))
+
+
+# ------------------------------------------------------------
+# Moving each integrated-signal peak back onto the R wave of the filtered ECG
+def refine_to_r_wave(peaks, filtered, fs):
+    window = max(int(INTEGRATION_WINDOW_S * fs), 1)
+    padded = np.concatenate((np.zeros(window), np.abs(filtered)))
+    # Row i covers filtered[peak - window, peak]
+    windows = sliding_window_view(padded, window + 1)
+    return peaks - window + np.argmax(windows[peaks], axis=1)
+
+
+# %% ---------------------------------------------------------
+# Detection
+# ------------------------------------------------------------
+
+# R-peak sample indices of a whole recording
+def detect_r_peaks(ecg, fs):
+    if len(ecg) < int(fs):
+        return np.zeros(0, dtype=np.int32)
+
+    filtered, integrated = pan_tompkins_signals(ecg, fs)
+    candidates, props = signal.find_peaks(integrated, height=0, distance=max(int(REFRACTORY_S * fs), 1))
+    heights = props["peak_heights"]
+
+    thresholds = adaptive_thresholds(heights)
+    beats = np.flatnonzero(heights > thresholds)
+    beats = search_back(beats, candidates, heights, thresholds)
+
+    peaks = refine_to_r_wave(candidates[beats], filtered, fs)
+    return np.unique(peaks).astype(np.int32)
+
+
+# ------------------------------------------------------------
+# Batch API: detecting R peaks of many segments in one pass
+def detect_r_peaks_batch(segments, fs):
+    """
+    Segments are joined (with a flat gap between them) and detected in one
+    vectorized pass; returns one int32 array of indices per segment,
+    relative to the start of that segment.
+    """
+    segments = [np.asarray(segment, dtype=np.float64) for segment in segments]
+    if not segments:
+        return []
+    gap = np.zeros(int(2 * REFRACTORY_S * fs))
+    starts = np.cumsum([0] + [len(segment) + len(gap) for segment in segments[:-1]])
+
+    peaks = detect_r_peaks(np.concatenate([np.concatenate((segment, gap)) for segment in segments]), fs)
+    bounds = np.searchsorted(peaks, np.append(starts, np.inf))
+
+    batch = []
+    for i, segment in enumerate(segments):
+        segment_peaks = peaks[bounds[i]:bounds[i + 1]] - starts[i]
+        batch.append(segment_peaks[segment_peaks < len(segment)].astype(np.int32))
+    return batch
@@ -0,0 +1,200 @@
+"""
+Last Update: 10/17/2026
+
+This code is for capturing screen regions of the MindWare HRV window.
+Only the requested region is grabbed, into a buffer that is reused between
+calls, and one frame can be shared by several checks that need the same
+moment (e.g. a popup check and a button lookup).
+
+Backends (MINDWARE_CAPTURE_BACKEND environment variable):
+    mss        fast region grabs (default when the mss package is installed)
+    pyautogui  pyautogui.screenshot fallback
+    fake       no screen access, for benchmarking the pipeline on Linux
+"""
+
+# %% ---------------------------------------------------------
+# Importing libraries
+# ------------------------------------------------------------
+
+import os
+import threading
+import time
+
+import numpy as np
+
+# %% ---------------------------------------------------------
+# Settings
+# ------------------------------------------------------------
+
+# MindWare window is forced to 1280x800 at (0, 0)
+WINDOW_REGION = (0, 0, 1280, 800)
+
+# Frames younger than this (seconds) are handed out again instead of re-captured
+SHARED_FRAME_MAX_AGE = 0.1
+
+# %% ---------------------------------------------------------
+# Capture backends
+# ------------------------------------------------------------
+
+class CaptureBackend:
+    """
+    Grabs (left, top, width, height) regions as RGB uint8 arrays.
+    The returned array is a reused buffer: copy it if it must outlive the next grab.
+    """
+
+    def __init__(self):
+        self._buffers = {}
+
+    def _buffer(self, width, height):
+        key = (width, height)
+        if key not in self._buffers:
+            self._buffers[key] = np.zeros((height, width, 3), dtype=np.uint8)
+        return self._buffers[key]
+
+    def grab(self, region=WINDOW_REGION):
+        raise NotImplementedError
+
+
+# ------------------------------------------------------------
+# mss: grabs only the requested region, straight from the OS
+class MssBackend(CaptureBackend):
+
+    def __init__(self):
+        super().__init__()
+        import mss
+        self._sct = mss.mss()
+        screen = self._sct.monitors[0]
+        self._bounds = (screen["left"], screen["top"],
+                        screen["left"] + screen["width"], screen["top"] + screen["height"])
+
+    def grab(self, region=WINDOW_REGION):
+        left, top, width, height = region
+        buffer = self._buffer(width, height)
+
+        # Parts of the region outside the screen stay black, like pyautogui.screenshot
+        x0, y0 = max(left, self._bounds[0]), max(top, self._bounds[1])
+        x1, y1 = min(left + width, self._bounds[2]), min(top + height, self._bounds[3])
+        if x1 <= x0 or y1 <= y0:
+            buffer[:] = 0
+            return buffer
+        if (x0, y0, x1, y1) != (left, top, left + width, top + height):
+            buffer[:] = 0
+
+        shot = self._sct.grab({"left": x0, "top": y0, "width": x1 - x0, "height": y1 - y0})
+        bgra = np.frombuffer(shot.raw, dtype=np.uint8).reshape(y1 - y0, x1 - x0, 4)
+        np.copyto(buffer[y0 - top:y1 - top, x0 - left:x1 - left], bgra[:, :, 2::-1])
+        return buffer
+
+
+# ------------------------------------------------------------
+# pyautogui: portable fallback (allocates a PIL image per grab)
+class PyAutoGuiBackend(CaptureBackend):
+
+    def grab(self, region=WINDOW_REGION):
+        import pyautogui
+        buffer = self._buffer(region[2], region[3])
+        np.copyto(buffer, np.asarray(pyautogui.screenshot(region=region).convert("RGB")))
+        return buffer
+
+
+# ------------------------------------------------------------
+# fake: serves regions of a fixed screen image (black by default)
+class FakeBackend(CaptureBackend):
+
+    def __init__(self, screen=None, size=(1280, 800)):
+        super().__init__()
+        if screen is None:
+            screen = np.zeros((size[1], size[0], 3), dtype=np.uint8)
+        self.screen = np.asarray(screen)[..., :3]
+        self.grab_count = 0
+
+    def grab(self, region=WINDOW_REGION):
+        left, top, width, height = region
+        buffer = self._buffer(width, height)
+        buffer[:] = 0
+        part = self.screen[max(top, 0):top + height, max(left, 0):left + width]
+        buffer[max(-top, 0):max(-top, 0) + part.shape[0], max(-left, 0):max(-left, 0) + part.shape[1]] = part
+        self.grab_count += 1
+        return buffer
+
+
+BACKENDS = {"mss": MssBackend, "pyautogui": PyAutoGuiBackend, "fake": FakeBackend}
+
+_backend = None
+
+
+# ------------------------------------------------------------
+# New backend as configured (background threads need their own: mss handles are per thread)
+def create_backend():
+    name = os.environ.get("MINDWARE_CAPTURE_BACKEND", "").lower()
+    if name:
+        return BACKENDS[name]()
+    try:
+        return MssBackend()
+    except ImportError:
+        return PyAutoGuiBackend()
+
+
+# ------------------------------------------------------------
+# Choosing the backend once per process
+def get_backend():
+    global _backend
+    if _backend is None:
+        _backend = create_backend()
+    return _backend
+
+
+def set_backend(backend):
+    global _backend
+    _backend = backend
+    invalidate_shared_frame()
+
+
+# %% ---------------------------------------------------------
+# Capturing
+# ------------------------------------------------------------
+
+# Grabbing one region (copy=False hands out the backend buffer itself)
+def grab(region=WINDOW_REGION, copy=True):
+    frame = get_backend().grab(region)
+    return frame.copy() if copy else frame
+
+
+# ------------------------------------------------------------
+# Shared frame of the whole window for checks that need the same moment
+_shared = {"frame": None, "time": 0.0}
+
+# Other threads (e.g. the pop-up watcher) invalidate the frame
+_shared_lock = threading.Lock()
+
+
+def shared_frame(max_age=SHARED_FRAME_MAX_AGE):
+    with _shared_lock:
+        frame = _shared["frame"]
+        if frame is None or time.time() - _shared["time"] > max_age:
+            grabbed = get_backend().grab(WINDOW_REGION)
+            # Own buffer, so other grabs of the same size do not overwrite it
+            if _shared.get("buffer") is None or _shared["buffer"].shape != grabbed.shape:
+                _shared["buffer"] = np.empty_like(grabbed)
+            np.copyto(_shared["buffer"], grabbed)
+            frame = _shared["frame"] = _shared["buffer"]
+            _shared["time"] = time.time()
+        return frame
+
+
+def invalidate_shared_frame():
+    with _shared_lock:
+        _shared["frame"] = None
+
+
+# ------------------------------------------------------------
+# Region of the shared frame (screen coordinates), without another grab
+def shared_region(region, max_age=SHARED_FRAME_MAX_AGE):
+    left, top, width, height = region
+    win_left, win_top, win_width, win_height = WINDOW_REGION
+    inside = (left >= win_left and top >= win_top
+              and left + width <= win_left + win_width and top + height <= win_top + win_height)
+    if not inside:
+        return grab(region)
+    frame = shared_frame(max_age)
+    return frame[top - win_top:top - win_top + height, left - win_left:left - win_left + width]
@@ -0,0 +1,94 @@
+"""
+Last Update: 10/17/2026
+
+This code is for pipelining the segment checks of the MindWare HRV workflow:
+the driver captures the ECG plot of a segment, hands it to a background
+worker and moves on to the next segment right away. The worker scores the
+yellow (problematic) R peaks of every capture and reports the results through
+a queue, so the driver only goes back to the segments that were flagged.
+"""
+
+# %% ---------------------------------------------------------
+# Importing libraries
+# ------------------------------------------------------------
+
+import queue
+import threading
+from collections import namedtuple
+
+from segment_qc import YELLOW_RATIO_THRESHOLD, yellow_ratios
+
+# %% ---------------------------------------------------------
+# Settings
+# ------------------------------------------------------------
+
+SegmentResult = namedtuple("SegmentResult", ["segment", "ratio", "flagged", "image"])
+
+# %% ---------------------------------------------------------
+# Background classifier
+# ------------------------------------------------------------
+
+class SegmentClassifier:
+    """
+    submit() never blocks the driver; every capture that is waiting when the
+    worker wakes up is scored in one yellow_ratios() batch. An error in the
+    worker is kept and raised again by poll() / close().
+    """
+
+    def __init__(self, threshold=YELLOW_RATIO_THRESHOLD):
+        self.threshold = threshold
+        self.results = queue.Queue()
+        self.error = None
+        self._jobs = queue.Queue()
+        self._worker = threading.Thread(target=self._run, name="segment-classifier", daemon=True)
+        self._worker.start()
+
+    # Captured plot of one segment (segment numbers start at 1)
+    def submit(self, segment, image):
+        self._jobs.put((segment, image))
+
+    def _run(self):
+        try:
+            self._classify()
+        except Exception as e:
+            self.error = e
+
+    def _classify(self):
+        done = False
+        while not done:
+            jobs = [self._jobs.get()]
+            while True:
+                try:
+                    jobs.append(self._jobs.get_nowait())
+                except queue.Empty:
+                    break
+            if None in jobs:
+                done = True
+                jobs = [job for job in jobs if job is not None]
+            if not jobs:
+                continue
+            for (segment, image), ratio in zip(jobs, yellow_ratios([image for _, image in jobs])):
+                flagged = bool(ratio > self.threshold)
+                # Only flagged plots are kept (for the review thumbnails)
+                self.results.put(SegmentResult(segment, float(ratio), flagged, image if flagged else None))
+
+    # ------------------------------------------------------------
+    # Results that are ready so far, without waiting
+    def poll(self):
+        if self.error is not None:
+            raise RuntimeError("Segment classifier failed") from self.error
+        ready = []
+        while True:
+            try:
+                ready.append(self.results.get_nowait())
+            except queue.Empty:
+                return ready
+
+    # ------------------------------------------------------------
+    # Waiting for the remaining captures; returns the results not polled yet, sorted by segment
+    def close(self, timeout=30):
+        self._jobs.put(None)
+        self._worker.join(timeout)
+        if self._worker.is_alive():
+            raise TimeoutError(f"Segment classifier still busy after {timeout} s")
+        return sorted(self.poll(), key=lambda result: result.segment)
@@ -0,0 +1,83 @@
+"""
+Last Update: 10/17/2026
+
+This code is for the visual segment QC of the MindWare HRV workflow:
+detecting problematic (yellow) R peaks on the ECG plot of a segment
+"""
+
+# %% ---------------------------------------------------------
+# Importing libraries
+# ------------------------------------------------------------
+
+import numpy as np
+
+# %% ---------------------------------------------------------
+# Settings
+# ------------------------------------------------------------
+
+# ECG plot of the current segment in the 1280x800 Analyze window
+ECG_SEGMENT_REGION = (403, 274, 700, 128)
+
+# Yellow pixel rule: r > 180 and g > 180 and b < 100
+YELLOW_MIN_RED = 180
+YELLOW_MIN_GREEN = 180
+YELLOW_MAX_BLUE = 100
+
+YELLOW_RATIO_THRESHOLD = 0.0001
+
+# %% ---------------------------------------------------------
+# Yellow pixel detection
+# ------------------------------------------------------------
+
+# Converting a screenshot (PIL image or array) to an RGB uint8 array
+def as_rgb_array(image):
+    pixels = np.asarray(image)
+    if pixels.ndim == 2:
+        # Grayscale pixels have r == g == b, so they can never be yellow
+        return np.repeat(pixels[..., None], 3, axis=-1)
+    return pixels[..., :3]
+
+
+# ------------------------------------------------------------
+# Boolean mask of the yellow pixels
+def yellow_mask(pixels):
+    pixels = as_rgb_array(pixels)
+    return ((pixels[..., 0] > YELLOW_MIN_RED)
+            & (pixels[..., 1] > YELLOW_MIN_GREEN)
+            & (pixels[..., 2] < YELLOW_MAX_BLUE))
+
+
+# ------------------------------------------------------------
+# Share of yellow pixels in one captured region
+def yellow_ratio(image):
+    mask = yellow_mask(image)
+    if mask.size == 0:
+        return 0.0
+    return float(np.count_nonzero(mask)) / mask.size
+
+
+# ------------------------------------------------------------
+# Batch API: scoring many captured regions in one call
+def yellow_ratios(images):
+    """
+    Returns the yellow_ratio of every captured region as a float array.
+    Regions of the same size are stacked and scored with a single mask.
+    """
+    arrays = [as_rgb_array(image) for image in images]
+    if not arrays:
+        return np.zeros(0)
+
+    if all(a.shape == arrays[0].shape for a in arrays):
+        mask = yellow_mask(np.stack(arrays))
+        pixels_per_region = max(mask[0].size, 1)
+        return mask.reshape(len(arrays), -1).sum(axis=1) / pixels_per_region
+
+    return np.array([yellow_ratio(a) for a in arrays])
+
+
+# ------------------------------------------------------------
+# Visual checker for detecting problematic R peaks
+def has_yellow_peaks(image, threshold=YELLOW_RATIO_THRESHOLD):
+    ratio = yellow_ratio(image)
+    print(f"Yellow pixel ratio: {ratio:.6f}")
+    return ratio > threshold
@@ -0,0 +1,115 @@
+"""
+Last Update: 10/17/2026
+
+This code is for applying the MindWare HRV analysis settings (segment time,
+calculation mode, LF/HF bands, output folder) only when they differ from the
+target configuration. MindWare keeps its settings between files of one
+session, so after the first file the settings step is one verification
+capture: the value boxes of the numeric fields on the first page are read
+by OCR (one shared frame, never from the OCR cache) and only fields that
+differ, or were never written in this session, are rewritten. Fields on the
+other tabs are not read back; they are trusted once written in the session.
+"""
+
+# %% ---------------------------------------------------------
+# Importing libraries
+# ------------------------------------------------------------
+
+import re
+from collections import namedtuple
+
+from ocr_engine import NUMBERS, PSM_SINGLE_LINE, read_text
+from screen_capture import invalidate_shared_frame, shared_region
+from template_cache import locate_template
+
+# %% ---------------------------------------------------------
+# Settings
+# ------------------------------------------------------------
+
+# tab: template of the settings tab the field is on (None = page shown when the dialog opens)
+# value_box: (x, y, width, height) of the white value box inside the template,
+# so the label is left out of the OCR crop; None when the value cannot be read back
+SettingField = namedtuple("SettingField", ["name", "template", "tab", "value_box"])
+
+SETTING_FIELDS = [
+    SettingField("segment_time", "segment_time_field.png", None, (21, 35, 80, 19)),
+    SettingField("calculation", "calculation_entire.png", "hrv_calibration_tab.png", None),
+    SettingField("lf_high", "lf_field.png", "hrv_calibration_tab.png", (62, 36, 52, 19)),
+    SettingField("hf_low", "hf_field.png", "hrv_calibration_tab.png", (28, 29, 51, 19)),
+    SettingField("hf_high", "hf_field2.png", "hrv_calibration_tab.png", (25, 27, 52, 19)),
+    SettingField("output_folder", "folder_field.png", "additional_settings_tab.png", None),
+]
+
+NUMBER_PATTERN = re.compile(r"\d+(\.\d+)?")
+
+# Two readings closer than this are the same value
+VALUE_TOLERANCE = 1e-6
+
+# %% ---------------------------------------------------------
+# Reading fields
+# ------------------------------------------------------------
+
+# Screen region of the value box of a located field template
+def value_region(field, box):
+    x, y, width, height = field.value_box
+    return (box[0] + x, box[1] + y, width, height)
+
+
+# ------------------------------------------------------------
+# Value shown in a numeric field; None if the field is not visible or unreadable
+def read_field_value(field):
+    box = locate_template(field.template, confidence=0.8)
+    if box is None:
+        return None
+    # Uncached: a changed value must never be answered with an earlier reading
+    text = read_text(shared_region(value_region(field, box)), whitelist=NUMBERS,
+                     psm=PSM_SINGLE_LINE, cache=False)
+    match = NUMBER_PATTERN.search(text)
+    return float(match.group()) if match else None
+
+
+# ------------------------------------------------------------
+# Values of the numeric fields of one page, all read from the same captured frame
+def read_page_values(tab=None):
+    invalidate_shared_frame()
+    return {field.name: read_field_value(field)
+            for field in SETTING_FIELDS if field.tab == tab and field.value_box}
+
+
+# %% ---------------------------------------------------------
+# Session state
+# ------------------------------------------------------------
+
+class SettingsState:
+
+    def __init__(self):
+        self.applied = {}
+
+    # MindWare was restarted: nothing written before can be trusted
+    def reset(self):
+        self.applied = {}
+
+    # ------------------------------------------------------------
+    # Names of the fields that have to be (re)written for the target configuration
+    def fields_to_write(self, target):
+        """
+        Fields never written in this session with the target value are always
+        written. Fields on the first page are checked by OCR; fields on other
+        tabs are trusted once written, so their tabs are not opened.
+        """
+        to_write = {name for name, value in target.items() if self.applied.get(name) != value}
+        if to_write >= set(target):
+            return to_write
+
+        shown = read_page_values()
+        for name, value in shown.items():
+            if name in target and (value is None or abs(value - float(target[name])) > VALUE_TOLERANCE):
+                print(f"Setting {name} shows {value}, expected {target[name]}")
+                to_write.add(name)
+        return to_write
+
+    # ------------------------------------------------------------
+    # Recording the fields written for the target configuration
+    def mark_applied(self, target, names):
+        for name in names:
+            self.applied[name] = target[name]
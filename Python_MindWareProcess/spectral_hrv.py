@@ -0,0 +1,106 @@
+"""
+Last Update: 10/17/2026
+
+This code is for the frequency-domain HRV of a segment: the IBI spectrum is
+computed once and LF, HF and LF/HF are integrated from that one spectrum for
+every configured band preset (Youth, Adults, Children), so comparing presets
+does not need another analysis run.
+
+Spectrum methods:
+    welch  cubic resampling of the IBI series at 4 Hz, then Welch's method
+    lomb   Lomb-Scargle periodogram of the uneven IBI series (no resampling)
+"""
+
+# %% ---------------------------------------------------------
+# Importing libraries
+# ------------------------------------------------------------
+
+import numpy as np
+from scipy import integrate, interpolate, signal
+
+# %% ---------------------------------------------------------
+# Settings
+# ------------------------------------------------------------
+
+# Same LF/HF bands as the age-group choice of MindwareAutoProccess_MainVersion.py
+BAND_PRESETS = {
+    "youth":    {"label": "Youth (7–17 years)",            "lf": (0.04, 0.15), "hf": (0.15, 0.40)},
+    "adults":   {"label": "Adults",                        "lf": (0.04, 0.12), "hf": (0.12, 1.00)},
+    "children": {"label": "Children & Infants (≤4 years)", "lf": (0.04, 0.24), "hf": (0.24, 1.04)},
+}
+
+# IBI series is resampled at this rate (Hz) for Welch's method
+IBI_RESAMPLE_HZ = 4.0
+
+# Frequency grid of the Lomb-Scargle periodogram (Hz); covers the widest HF band
+LOMB_FREQUENCIES = np.arange(0.003, 1.1, 0.001)
+
+MIN_BEATS = 4
+
+# %% ---------------------------------------------------------
+# IBI spectrum
+# ------------------------------------------------------------
+
+# Welch PSD (ms²/Hz) of the IBI series resampled on an even grid
+def welch_spectrum(beat_times, ibi_ms):
+    grid = np.arange(beat_times[0], beat_times[-1], 1 / IBI_RESAMPLE_HZ)
+    if len(grid) < 16:
+        return None, None
+    resampled = interpolate.CubicSpline(beat_times, ibi_ms)(grid)
+    return signal.welch(resampled - resampled.mean(), fs=IBI_RESAMPLE_HZ,
+                        nperseg=min(256, len(resampled)))
+
+
+# ------------------------------------------------------------
+# Lomb-Scargle PSD of the uneven IBI series, scaled so that its total power
+# equals the IBI variance (ms²)
+def lomb_spectrum(beat_times, ibi_ms, freqs=LOMB_FREQUENCIES):
+    centered = ibi_ms - ibi_ms.mean()
+    psd = signal.lombscargle(beat_times, centered, 2 * np.pi * freqs)
+    total = integrate.trapezoid(psd, freqs)
+    if total > 0:
+        psd = psd * centered.var() / total
+    return freqs, psd
+
+
+SPECTRUM_METHODS = {"welch": welch_spectrum, "lomb": lomb_spectrum}
+
+
+def ibi_spectrum(beat_times, ibi_ms, method="welch"):
+    if len(ibi_ms) < MIN_BEATS:
+        return None, None
+    return SPECTRUM_METHODS[method](np.asarray(beat_times, dtype=np.float64),
+                                    np.asarray(ibi_ms, dtype=np.float64))
+
+
+# %% ---------------------------------------------------------
+# Band powers
+# ------------------------------------------------------------
+
+def _band_power(freqs, psd, band):
+    mask = (freqs >= band[0]) & (freqs < band[1])
+    return float(integrate.trapezoid(psd[mask], freqs[mask])) if mask.sum() > 1 else np.nan
+
+
+# ------------------------------------------------------------
+# LF, HF and LF/HF of every preset from one spectrum
+def preset_band_powers(freqs, psd, presets=BAND_PRESETS):
+    results = {}
+    for name, preset in presets.items():
+        if freqs is None:
+            lf = hf = np.nan
+        else:
+            lf, hf = _band_power(freqs, psd, preset["lf"]), _band_power(freqs, psd, preset["hf"])
+        results[name] = {"lf_power": lf, "hf_power": hf, "lf_hf_ratio": lf / hf if hf else np.nan}
+    return results
+
+
+# ------------------------------------------------------------
+# One segment: spectrum once, all presets; flat columns like lf_power_youth
+def segment_band_powers(beat_times, ibi_ms, presets=BAND_PRESETS, method="welch"):
+    freqs, psd = ibi_spectrum(beat_times, ibi_ms, method=method)
+    columns = {}
+    for name, powers in preset_band_powers(freqs, psd, presets).items():
+        for metric, value in powers.items():
+            columns[f"{metric}_{name}"] = value
+    return columns
@@ -0,0 +1,212 @@
+"""
+Last Update: 10/17/2026
+
+This code is for timing every step of the MindWare HRV workflow (open file,
+channel map, event channel, settings, analyze, segment checks, export) so a
+long batch shows where the time went. Each step is written as one JSON line
+(file, step, start, end, duration, retries, outcome) to a trace file; nested
+steps (typing, OCR, operator pauses) are recorded with their parent step.
+
+Usage:
+    python step_trace.py summary <trace.jsonl>                 per-step latency percentiles
+    python step_trace.py chrome <trace.jsonl> [<trace.json>]   trace-event file for chrome://tracing or Perfetto
+"""
+
+# %% ---------------------------------------------------------
+# Importing libraries
+# ------------------------------------------------------------
+
+import argparse
+import json
+import os
+import time
+from contextlib import contextmanager
+
+import numpy as np
+
+# %% ---------------------------------------------------------
+# Settings
+# ------------------------------------------------------------
+
+OK = "ok"
+ERROR = "error"
+
+PERCENTILES = (50, 90, 99)
+
+# %% ---------------------------------------------------------
+# Recording
+# ------------------------------------------------------------
+
+class StepTracer:
+
+    def __init__(self, trace_path):
+        self.trace_path = trace_path
+        self.run_id = time.strftime("%Y%m%d-%H%M%S")
+        self.file_name = None
+        self._stack = []
+        # Line-buffered append: every finished step is on disk even if the run dies
+        self._out = open(trace_path, "a", encoding="utf-8", buffering=1)
+
+    # ------------------------------------------------------------
+    # Timing one step; the yielded record takes retries/outcome updates
+    @contextmanager
+    def step(self, name, **details):
+        record = {
+            "run": self.run_id,
+            "file": self.file_name,
+            "step": name,
+            "parent": self._stack[-1]["step"] if self._stack else None,
+            "start": time.time(),
+            "retries": 0,
+            "outcome": OK,
+        }
+        record.update(details)
+        self._stack.append(record)
+        try:
+            yield record
+        except BaseException as e:
+            record["outcome"] = ERROR
+            record["error"] = repr(e)
+            raise
+        finally:
+            self._stack.pop()
+            record["end"] = time.time()
+            record["duration"] = record["end"] - record["start"]
+            self._out.write(json.dumps(record) + "\n")
+
+    # Innermost running step, or None
+    def current(self):
+        return self._stack[-1] if self._stack else None
+
+    def close(self):
+        self._out.close()
+
+
+# ------------------------------------------------------------
+# Module-level tracer, so helpers (wait_and_click, type_text) can report
+# into whatever step is running without passing the tracer around
+_tracer = None
+
+
+def start_trace(trace_path):
+    global _tracer
+    _tracer = StepTracer(trace_path)
+    print(f"Step trace: {trace_path}")
+    return _tracer
+
+
+def set_file(file_name):
+    if _tracer is not None:
+        _tracer.file_name = file_name
+
+
+@contextmanager
+def step(name, **details):
+    if _tracer is None:
+        yield {}
+        return
+    with _tracer.step(name, **details) as record:
+        yield record
+
+
+def add_retry(count=1):
+    record = _tracer.current() if _tracer is not None else None
+    if record is not None:
+        record["retries"] += count
+
+
+def set_outcome(outcome):
+    record = _tracer.current() if _tracer is not None else None
+    if record is not None:
+        record["outcome"] = outcome
+
+
+def annotate(**details):
+    record = _tracer.current() if _tracer is not None else None
+    if record is not None:
+        record.update(details)
+
+
+# %% ---------------------------------------------------------
+# Reading a trace
+# ------------------------------------------------------------
+
+def read_trace(trace_path):
+    with open(trace_path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+# ------------------------------------------------------------
+# Per-step count, total time, latency percentiles, retries and outcomes
+def summarize(records):
+    by_step = {}
+    for record in records:
+        by_step.setdefault(record["step"], []).append(record)
+
+    summary = {}
+    for name, step_records in by_step.items():
+        durations = np.array([r["duration"] for r in step_records])
+        outcomes = {}
+        for r in step_records:
+            outcomes[r["outcome"]] = outcomes.get(r["outcome"], 0) + 1
+        summary[name] = {
+            "count": len(step_records),
+            "total": float(durations.sum()),
+            **{f"p{p}": float(np.percentile(durations, p)) for p in PERCENTILES},
+            "max": float(durations.max()),
+            "retries": sum(r["retries"] for r in step_records),
+            "outcomes": outcomes,
+        }
+    return dict(sorted(summary.items(), key=lambda item: -item[1]["total"]))
+
+
+def print_summary(summary):
+    header = f"{'step':<24}{'count':>7}{'total s':>10}" + "".join(f"{'p' + str(p):>9}" for p in PERCENTILES)
+    print(header + f"{'max':>9}{'retries':>9}  outcomes")
+    for name, s in summary.items():
+        row = f"{name:<24}{s['count']:>7}{s['total']:>10.1f}" + "".join(f"{s['p' + str(p)]:>9.2f}" for p in PERCENTILES)
+        print(row + f"{s['max']:>9.2f}{s['retries']:>9}  {s['outcomes']}")
+
+
+# ------------------------------------------------------------
+# Trace-event format (complete "X" events, microseconds); one track per file
+def to_trace_events(records):
+    tracks = {}
+    events = []
+    for record in records:
+        tid = tracks.setdefault(record["file"], len(tracks))
+        events.append({
+            "name": record["step"],
+            "cat": record["outcome"],
+            "ph": "X",
+            "ts": record["start"] * 1e6,
+            "dur": record["duration"] * 1e6,
+            "pid": 1,
+            "tid": tid,
+            "args": {k: v for k, v in record.items() if k not in ("step", "start", "end", "duration")},
+        })
+    for file_name, tid in tracks.items():
+        events.append({"name": "thread_name", "ph": "M", "pid": 1, "tid": tid,
+                       "args": {"name": file_name or "(startup)"}})
+    return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Summarize or convert a MindWare workflow step trace")
+    parser.add_argument("command", choices=["summary", "chrome"])
+    parser.add_argument("trace")
+    parser.add_argument("output", nargs="?")
+    args = parser.parse_args()
+
+    records = read_trace(args.trace)
+    if args.command == "summary":
+        print_summary(summarize(records))
+    else:
+        output = args.output or os.path.splitext(args.trace)[0] + ".json"
+        with open(output, "w", encoding="utf-8") as f:
+            json.dump(to_trace_events(records), f)
+        print(f"Saved {len(records)} steps to {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+"""
+Last Update: 10/17/2026
+
+This code is for locating the button/field templates (analyze_button.png,
+lf_field.png, event_ok.png, ...) of the MindWare HRV window quickly:
+templates are loaded once as arrays, the last matched location of each
+template is remembered across runs, and only a small region around that
+location is searched before falling back to a full-screen scan.
+"""
+
+# %% ---------------------------------------------------------
+# Importing libraries
+# ------------------------------------------------------------
+
+import json
+import os
+
+import numpy as np
+import pyautogui
+from PIL import Image
+
+from screen_capture import grab, shared_region
+
+# %% ---------------------------------------------------------
+# Settings
+# ------------------------------------------------------------
+
+TEMPLATE_DIR = os.path.dirname(os.path.abspath(__file__))
+LOCATION_CACHE_PATH = os.path.join(TEMPLATE_DIR, "template_locations.json")
+
+# Extra pixels searched around the cached location
+ROI_MARGIN = 40
+
+_templates = {}
+_locations = None
+
+# %% ---------------------------------------------------------
+# Templates
+# ------------------------------------------------------------
+
+# Loading a template once as an array (BGR, the channel order OpenCV matching expects)
+def load_template(image_path):
+    if image_path not in _templates:
+        full_path = image_path if os.path.isabs(image_path) else os.path.join(TEMPLATE_DIR, image_path)
+        rgb = np.asarray(Image.open(full_path).convert("RGB"))
+        _templates[image_path] = np.ascontiguousarray(rgb[:, :, ::-1])
+    return _templates[image_path]
+
+
+# ------------------------------------------------------------
+# Preloading every template of the workflow before the file loop starts
+def preload_templates(image_paths):
+    for image_path in image_paths:
+        try:
+            load_template(image_path)
+        except FileNotFoundError:
+            print(f"WARNING: template {image_path} not found")
+
+
+# %% ---------------------------------------------------------
+# Persistent location cache
+# ------------------------------------------------------------
+
+def _load_locations():
+    global _locations
+    if _locations is None:
+        try:
+            with open(LOCATION_CACHE_PATH) as f:
+                _locations = {name: tuple(box) for name, box in json.load(f).items()}
+        except (FileNotFoundError, ValueError):
+            _locations = {}
+    return _locations
+
+
+def _save_locations():
+    tmp_path = LOCATION_CACHE_PATH + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(_locations, f, indent=2)
+    os.replace(tmp_path, LOCATION_CACHE_PATH)
+
+
+# ------------------------------------------------------------
+# Forgetting the cached location of one template (or all of them)
+def invalidate_location(image_path=None):
+    locations = _load_locations()
+    if image_path is None:
+        locations.clear()
+    else:
+        locations.pop(image_path, None)
+    _save_locations()
+
+
+# %% ---------------------------------------------------------
+# Matching
+# ------------------------------------------------------------
+
+def _locate(needle, haystack, confidence):
+    # Captured frames are RGB, templates are BGR
+    haystack = np.ascontiguousarray(haystack[:, :, ::-1])
+    try:
+        return pyautogui.locate(needle, haystack, confidence=confidence)
+    except pyautogui.ImageNotFoundException:
+        return None
+
+
+# ------------------------------------------------------------
+# Matching a template in an already captured frame; box in frame coordinates or None
+def match_template(image_path, frame, confidence=0.9):
+    match = _locate(load_template(image_path), frame, confidence)
+    if not match:
+        return None
+    return (int(match.left), int(match.top), int(match.width), int(match.height))
+
+
+# ------------------------------------------------------------
+# Region of interest around a cached box, clipped to the screen
+def _roi_around(box, margin=ROI_MARGIN):
+    screen_width, screen_height = pyautogui.size()
+    left = max(box[0] - margin, 0)
+    top = max(box[1] - margin, 0)
+    right = min(box[0] + box[2] + margin, screen_width)
+    bottom = min(box[1] + box[3] + margin, screen_height)
+    return (left, top, right - left, bottom - top)
+
+
+# ------------------------------------------------------------
+# Locating a template: cached ROI first, full screen only on a miss
+def locate_template(image_path, confidence=0.9):
+    """
+    Returns the (left, top, width, height) box of the template or None.
+    """
+    needle = load_template(image_path)
+    locations = _load_locations()
+
+    cached = locations.get(image_path)
+    if cached:
+        roi = _roi_around(cached)
+        match = _locate(needle, shared_region(roi), confidence)
+        if match:
+            return (int(roi[0] + match.left), int(roi[1] + match.top), int(match.width), int(match.height))
+
+    screen_width, screen_height = pyautogui.size()
+    match = _locate(needle, grab((0, 0, screen_width, screen_height)), confidence)
+    if not match:
+        return None
+
+    box = (int(match.left), int(match.top), int(match.width), int(match.height))
+    if box != cached:
+        # Found somewhere else on the full scan: replacing the stale location
+        locations[image_path] = box
+        _save_locations()
+    return box
+
+
+# ------------------------------------------------------------
+# Center point of a located template (same result as locateCenterOnScreen)
+def locate_template_center(image_path, confidence=0.9):
+    box = locate_template(image_path, confidence=confidence)
+    if box is None:
+        return None
+    return pyautogui.center(box)
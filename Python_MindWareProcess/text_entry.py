@@ -0,0 +1,95 @@
+"""
+Last Update: 10/17/2026
+
+This code is for entering text (folder paths, file names, settings values)
+into MindWare HRV fields quickly: the value is pasted in one operation through
+the clipboard and the field contents are then confirmed, by copying the field
+back (read-back) or by OCR of the field region. Only when the check fails is
+the value typed key by key, as before.
+"""
+
+# %% ---------------------------------------------------------
+# Importing libraries
+# ------------------------------------------------------------
+
+import time
+
+import pyautogui
+import pyperclip
+
+from ocr_engine import PSM_SINGLE_LINE, read_text
+from screen_capture import grab
+
+# %% ---------------------------------------------------------
+# Settings
+# ------------------------------------------------------------
+
+# Time for the clipboard / field to update after a paste or copy (seconds)
+CLIPBOARD_SETTLE = 0.15
+
+# Put on the clipboard before a read-back, to tell "nothing was copied" apart
+READ_BACK_SENTINEL = "\x00mindware-read-back\x00"
+
+TYPE_INTERVAL = 0.1
+
+PASTED = "pasted"
+TYPED = "typed"
+
+# %% ---------------------------------------------------------
+# Clipboard entry
+# ------------------------------------------------------------
+
+# Replacing the contents of the focused field with one paste
+def paste_text(text):
+    pyperclip.copy(text)
+    pyautogui.hotkey('ctrl', 'a')
+    pyautogui.hotkey('ctrl', 'v')
+    time.sleep(CLIPBOARD_SETTLE)
+
+
+# ------------------------------------------------------------
+# Contents of the focused field (select all + copy); None if the field cannot be copied
+def read_back_field():
+    pyperclip.copy(READ_BACK_SENTINEL)
+    pyautogui.hotkey('ctrl', 'a')
+    pyautogui.hotkey('ctrl', 'c')
+    time.sleep(CLIPBOARD_SETTLE)
+    value = pyperclip.paste()
+    return None if value == READ_BACK_SENTINEL else value
+
+
+# ------------------------------------------------------------
+# Whether the field shows `text`: read-back first, OCR of the field region if that is not possible
+def field_matches(text, region=None):
+    value = read_back_field()
+    if value is not None:
+        return value.strip() == text.strip()
+    if region is None:
+        return False
+    extracted = read_text(grab(region, copy=False), psm=PSM_SINGLE_LINE, cache=False)
+    # OCR drops spaces and misreads separators, so only the characters are compared
+    return "".join(extracted.split()) == "".join(text.split())
+
+
+# ------------------------------------------------------------
+# Typing key by key (the old type_text)
+def type_keys(text, interval=TYPE_INTERVAL):
+    pyautogui.hotkey('ctrl', 'a')
+    pyautogui.press('delete')
+    pyautogui.write(text, interval=interval)
+
+
+# ------------------------------------------------------------
+# Fast entry: paste, confirm, type only if the check fails; returns PASTED or TYPED
+def paste_and_verify(text, region=None, fallback=type_keys):
+    original_clipboard = pyperclip.paste()
+    try:
+        paste_text(text)
+        if field_matches(text, region):
+            return PASTED
+        print(f"WARNING: pasted value not confirmed, typing '{text}' instead")
+        fallback(text)
+        return TYPED
+    finally:
+        # The operator's clipboard is left as it was
+        pyperclip.copy(original_clipboard)
@@ -0,0 +1,123 @@
+"""
+Last Update: 10/17/2026
+
+This code is for synchronizing the MindWare HRV automation with the UI:
+instead of fixed sleeps, each step waits for an observable condition
+(a template appears, a screen region stops changing, a window title changes)
+and moves on as soon as it holds. Every wait has a timeout.
+"""
+
+# %% ---------------------------------------------------------
+# Importing libraries
+# ------------------------------------------------------------
+
+import time
+
+import numpy as np
+import pygetwindow as gw
+
+from screen_capture import grab
+from template_cache import locate_template_center
+
+# %% ---------------------------------------------------------
+# Settings
+# ------------------------------------------------------------
+
+# MindWare window is forced to 1280x800 at (0, 0)
+WINDOW_REGION = (0, 0, 1280, 800)
+WINDOW_TITLE = "MindWare HRV Analysis"
+
+POLL_INTERVAL = 0.2
+
+# %% ---------------------------------------------------------
+# Generic waiting
+# ------------------------------------------------------------
+
+# Polling a condition until it returns something truthy or the timeout expires
+def wait_until(condition, timeout=10, interval=POLL_INTERVAL, description="condition"):
+    start_time = time.time()
+    while True:
+        result = condition()
+        if result:
+            print(f"{description} after {time.time() - start_time:.1f} s")
+            return result
+        if time.time() - start_time >= timeout:
+            print(f"WARNING: timed out after {timeout} s waiting for {description}")
+            return None
+        time.sleep(interval)
+
+
+# %% ---------------------------------------------------------
+# Conditions
+# ------------------------------------------------------------
+
+# Waiting for a template to appear on screen; returns its center or None
+def wait_for_template(image_path, confidence=0.9, timeout=15):
+    return wait_until(lambda: locate_template_center(image_path, confidence=confidence),
+                      timeout=timeout, description=f"{image_path} visible")
+
+
+# ------------------------------------------------------------
+# Grabbing a region as an array for frame comparisons
+def grab_region(region=WINDOW_REGION):
+    return grab(region)
+
+
+# ------------------------------------------------------------
+# Waiting until a region stops changing for `settle_time` seconds
+def wait_for_region_stable(region=WINDOW_REGION, settle_time=0.6, timeout=10, interval=POLL_INTERVAL):
+    state = {"frame": grab_region(region), "since": time.time()}
+
+    def settled():
+        frame = grab_region(region)
+        if not np.array_equal(frame, state["frame"]):
+            state["frame"], state["since"] = frame, time.time()
+            return False
+        return time.time() - state["since"] >= settle_time
+
+    return bool(wait_until(settled, timeout=timeout, interval=interval,
+                           description=f"region {region} stable"))
+
+
+# ------------------------------------------------------------
+# Waiting until a region differs from a reference frame (e.g. after a click)
+def wait_for_region_change(reference, region=WINDOW_REGION, timeout=10, interval=POLL_INTERVAL):
+    return bool(wait_until(lambda: not np.array_equal(grab_region(region), reference),
+                           timeout=timeout, interval=interval,
+                           description=f"region {region} changed"))
+
+
+# ------------------------------------------------------------
+# Waiting for the redraw caused by an action: a change from the frame grabbed before the
+# action first, then stability (stability alone returns at once on the still-old screen)
+def wait_for_redraw(reference, region=WINDOW_REGION, change_timeout=5, settle_time=0.6, timeout=10):
+    if not wait_for_region_change(reference, region=region, timeout=change_timeout):
+        return False
+    wait_for_region_stable(region, settle_time=settle_time, timeout=timeout)
+    return True
+
+
+# ------------------------------------------------------------
+# Waiting for a window whose title contains `title`; returns the window or None
+def wait_for_window(title=WINDOW_TITLE, timeout=60, interval=0.5):
+    def find():
+        windows = gw.getWindowsWithTitle(title)
+        return windows[0] if windows else None
+    return wait_until(find, timeout=timeout, interval=interval, description=f"window '{title}'")
+
+
+# ------------------------------------------------------------
+# Title of the foreground window ("" if there is none)
+def active_window_title():
+    window = gw.getActiveWindow()
+    return window.title if window else ""
+
+
+# ------------------------------------------------------------
+# Waiting until the foreground window title is different from `old_title`
+def wait_for_title_change(old_title, timeout=10, interval=POLL_INTERVAL):
+    def changed():
+        title = active_window_title()
+        return title if title != old_title else None
+    return wait_until(changed, timeout=timeout, interval=interval,
+                      description=f"window title changed from '{old_title}'")
@@ -0,0 +1,250 @@
+"""
+Last Update: 10/17/2026
+
+This code is for running the per-file MindWare HRV workflow as explicit
+states (opened, channel-mapped, event-added, configured, analyzed, reviewed,
+exported) under a watchdog. The watchdog thread notices a hung or crashed
+MindWare or a state that takes far longer than it should; the file is then
+resumed after a MindWare restart from its last completed state, without
+anyone at the console. States that only live in the MindWare session
+(the opened file, the settings, the analysis) are replayed after a restart;
+the others (e.g. segment checks whose flags are in the review queue) are not.
+"""
+
+# %% ---------------------------------------------------------
+# Importing libraries
+# ------------------------------------------------------------
+
+import _thread
+import threading
+import time
+import traceback
+from collections import namedtuple
+from contextlib import contextmanager
+
+from step_trace import step
+
+# %% ---------------------------------------------------------
+# Settings
+# ------------------------------------------------------------
+
+OPENED = "opened"
+CHANNEL_MAPPED = "channel-mapped"
+EVENT_ADDED = "event-added"
+CONFIGURED = "configured"
+ANALYZED = "analyzed"
+REVIEWED = "reviewed"
+EXPORTED = "exported"
+
+STATES = [OPENED, CHANNEL_MAPPED, EVENT_ADDED, CONFIGURED, ANALYZED, REVIEWED, EXPORTED]
+
+# Longest time (seconds) a state may take before it counts as stalled
+STATE_TIMEOUTS = {
+    OPENED: 120,
+    CHANNEL_MAPPED: 120,
+    EVENT_ADDED: 120,
+    CONFIGURED: 180,
+    ANALYZED: 300,
+    REVIEWED: 1800,
+    EXPORTED: 180,
+}
+
+WATCHDOG_INTERVAL = 5
+
+# Restarts of MindWare for one file before the file is given up
+MAX_RESTARTS = 2
+
+# state: reached when action returns; name: step name in the trace;
+# action returns False when the file cannot be processed (e.g. channel map failed);
+# replay: the state has to be redone after a MindWare restart
+WorkflowStep = namedtuple("WorkflowStep", ["state", "name", "action", "replay"])
+
+
+class OperatorNeeded(Exception):
+    """An unattended run reached a point where the script would wait for the operator."""
+
+
+# %% ---------------------------------------------------------
+# Watchdog
+# ------------------------------------------------------------
+
+class Watchdog(threading.Thread):
+    """
+    Checks every few seconds whether the running state is past its timeout
+    or whether check_hung() reports a problem (returns a reason string).
+    When it trips, the main thread is interrupted (KeyboardInterrupt) so the
+    workflow runner can restart MindWare. heartbeat() is called every
+    heartbeat_interval seconds while a file is being worked on (operator
+    pauses included), e.g. to refresh the resume manifest claim.
+    """
+
+    def __init__(self, check_hung=None, interval=WATCHDOG_INTERVAL, heartbeat=None, heartbeat_interval=60):
+        super().__init__(name="mindware-watchdog", daemon=True)
+        self.check_hung = check_hung
+        self.interval = interval
+        self.heartbeat = heartbeat
+        self.heartbeat_interval = heartbeat_interval
+        self._last_heartbeat = 0.0
+        self.tripped = None
+        self._state = None
+        self._deadline = None
+        self._paused = 0
+        # Bumped on every enter()/idle(), so a check started for one state cannot trip another
+        self._generation = 0
+        # Interrupt sent to the main thread but not yet caught by the runner
+        self._pending = False
+        self._lock = threading.Lock()
+
+    def enter(self, state, timeout=None):
+        self._absorb_pending_trip()
+        with self._lock:
+            self._state = state
+            self._deadline = time.time() + (timeout or STATE_TIMEOUTS.get(state, 300))
+            self._generation += 1
+            self.tripped = None
+
+    def idle(self):
+        with self._lock:
+            self._state = self._deadline = None
+            self._generation += 1
+        self._absorb_pending_trip()
+
+    # ------------------------------------------------------------
+    # A trip whose KeyboardInterrupt has not reached the main thread yet is taken here,
+    # so it cannot land outside the state it was meant for (e.g. in manifest.claim)
+    def _absorb_pending_trip(self, timeout=1.0):
+        if not self._pending:
+            return
+        try:
+            deadline = time.time() + timeout
+            while self._pending and time.time() < deadline:
+                time.sleep(0.01)
+        except KeyboardInterrupt:
+            pass
+        self._pending = False
+
+    # ------------------------------------------------------------
+    # Called by the runner on KeyboardInterrupt: the trip reason, or None for a real Ctrl+C
+    def take_trip(self):
+        if not self._pending:
+            return None
+        self._pending = False
+        return self.tripped
+
+    # ------------------------------------------------------------
+    # Operator pauses do not count against the state timeout
+    @contextmanager
+    def paused(self):
+        with self._lock:
+            self._paused += 1
+            remaining = self._deadline - time.time() if self._deadline else None
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._paused -= 1
+                if remaining is not None and self._deadline is not None:
+                    self._deadline = time.time() + max(remaining, self.interval)
+
+    # Interrupting only if the main thread is still in the state the check was made for
+    def _trip(self, reason, generation):
+        with self._lock:
+            if generation != self._generation or self._deadline is None or self._paused:
+                return
+            self.tripped = reason
+            self._deadline = None
+            self._pending = True
+            print(f"\nWATCHDOG: {reason}")
+            _thread.interrupt_main()
+
+    def _beat(self):
+        with self._lock:
+            working = self._deadline is not None or self._paused
+        if not working or self.heartbeat is None or time.time() - self._last_heartbeat < self.heartbeat_interval:
+            return
+        self._last_heartbeat = time.time()
+        try:
+            self.heartbeat()
+        except Exception as e:
+            print(f"WARNING: heartbeat failed: {e}")
+
+    def run(self):
+        while True:
+            time.sleep(self.interval)
+            self._beat()
+            with self._lock:
+                if self._deadline is None or self._paused:
+                    continue
+                state, overdue = self._state, time.time() > self._deadline
+                generation = self._generation
+            if overdue:
+                self._trip(f"state after '{state}' stalled", generation)
+                continue
+            reason = self.check_hung() if self.check_hung else None
+            if reason:
+                self._trip(reason, generation)
+
+
+# %% ---------------------------------------------------------
+# Running one file
+# ------------------------------------------------------------
+
+class WorkflowRunner:
+    """
+    restart: restarts MindWare (e.g. app_launcher.restart_mindware)
+    on_state: called with (path, state) after every completed state
+    """
+
+    def __init__(self, watchdog, restart, on_state=None, max_restarts=MAX_RESTARTS):
+        self.watchdog = watchdog
+        self.restart = restart
+        self.on_state = on_state
+        self.max_restarts = max_restarts
+
+    def _skip(self, workflow_step, completed):
+        if completed is None or workflow_step.state is None or workflow_step.replay:
+            return False
+        return STATES.index(workflow_step.state) <= STATES.index(completed)
+
+    # ------------------------------------------------------------
+    # Runs the steps from the last completed state; returns (finished, last completed state, error)
+    def run_file(self, path, steps, completed=None):
+        restarts = 0
+        while True:
+            try:
+                for workflow_step in steps:
+                    if self._skip(workflow_step, completed):
+                        print(f"Resuming: '{workflow_step.state}' already done")
+                        continue
+                    self.watchdog.enter(workflow_step.state)
+                    with step(workflow_step.name, state=workflow_step.state):
+                        result = workflow_step.action()
+                    if result is False:
+                        self.watchdog.idle()
+                        return False, completed, f"{workflow_step.name} failed"
+                    if workflow_step.state is not None:
+                        if completed is None or STATES.index(workflow_step.state) > STATES.index(completed):
+                            completed = workflow_step.state
+                        if self.on_state:
+                            self.on_state(path, workflow_step.state)
+                self.watchdog.idle()
+                return True, completed, None
+
+            except KeyboardInterrupt:
+                # A real Ctrl+C from the console still stops the run
+                error = self.watchdog.take_trip()
+                if not error:
+                    raise
+            except Exception as e:
+                # Unexpected dialogs and failures end up here instead of waiting at the console
+                error = f"{type(e).__name__}: {e}"
+                traceback.print_exc()
+
+            self.watchdog.idle()
+            restarts += 1
+            if restarts > self.max_restarts:
+                print(f"Giving up after {self.max_restarts} restarts: {error}")
+                return False, completed, error
+            print(f"Restarting MindWare ({restarts}/{self.max_restarts}), resuming after '{completed}': {error}")
+            with step("restart", reason=error):
+                self.restart()
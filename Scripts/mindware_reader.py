@@ -0,0 +1,226 @@
+"""
+Last Update: 10/17/2026
+
+This code is for reading the MindWare HRV exports (.xlsx) in Python, as a fast
+replacement for read_mindware_files() in data_wrangling.R.
+Only the "HRV Stats" sheet is streamed (openpyxl read-only mode) and reading
+stops after the last metric row that is needed. Files are read in parallel and
+the result is one columnar table with the same columns as hrv_raw.
+
+Usage:
+    python mindware_reader.py <MindWare_Files folder> [--output hrv_raw.csv] [--workers N]
+"""
+
+# %% ---------------------------------------------------------
+# Importing libraries
+# ------------------------------------------------------------
+
+import argparse
+import os
+import re
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+import numpy as np
+import openpyxl
+import pandas as pd
+
+from phasic_metrics import study_metric_rows
+
+# %% ---------------------------------------------------------
+# Settings (same as data_wrangling.R)
+# ------------------------------------------------------------
+
+SEGMENT_SHEET_NAME = "HRV Stats"
+
+# Bump when the extraction below changes, so cached extractions are redone
+EXTRACTOR_VERSION = 1
+
+FILENAME_PATTERN = re.compile(r"^(\d+)_F31_([MF])_(AQ|EXT)(\d)_([0-9]{8})_.*_(\d+)_(\d+)_(\d+)\.xlsx$")
+
+# Data rows of the sheet as read_excel numbers them (the first row is the header)
+METRIC_ROWS = {
+    "segment_duration": 9,
+    "mean_hr": 56,
+    "sdnn": 65,
+    "rmssd": 67,
+}
+
+KEY_METRICS = ["mean_hr", "rmssd", "sdnn"]
+
+# data_wrangling.R computes the phasic indices for the last key metric only
+PHASIC_METRICS = ["sdnn"]
+
+NUMBER_PATTERN = re.compile(r"^-?\d+\.?\d*$")
+
+# %% ---------------------------------------------------------
+# Reading one file
+# ------------------------------------------------------------
+
+# Cell value to a number, like the sapply() in data_wrangling.R
+def parse_value(value):
+    if value is None:
+        return np.nan
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return float(value)
+    text = str(value).strip()
+    if NUMBER_PATTERN.match(text):
+        return float(text)
+    return np.nan
+
+
+# ------------------------------------------------------------
+# Participant metadata from the file name; None if the name does not match
+def parse_filename(file_name):
+    match = FILENAME_PATTERN.match(file_name)
+    if not match:
+        return None
+    return {
+        "id": match.group(1),
+        "sex": match.group(2),
+        "task_type": match.group(3),
+        "task_version": match.group(4),
+        "collection_date": datetime.strptime(match.group(5), "%m%d%Y").date(),
+    }
+
+
+# ------------------------------------------------------------
+# Streaming the "HRV Stats" sheet up to the last needed row
+def read_metric_rows(filename, metric_rows=METRIC_ROWS):
+    """
+    Returns ({metric: [value per segment]}, n_segments).
+    Like read_excel, leading empty rows are skipped and the first row is the header.
+    """
+    workbook = openpyxl.load_workbook(filename, read_only=True, data_only=True)
+    try:
+        sheet = workbook[SEGMENT_SHEET_NAME]
+        first_col = sheet.min_column or 1
+        last_col = sheet.max_column or first_col
+        wanted = {row: name for name, row in metric_rows.items()}
+        last_wanted = max(wanted)
+
+        raw, header_seen, data_row, widest = {}, False, 0, first_col
+        for row in sheet.iter_rows(min_col=first_col, values_only=True):
+            if not header_seen:
+                if all(v is None for v in row):
+                    continue
+                header_seen = True
+            else:
+                data_row += 1
+            if any(v is not None for v in row):
+                widest = max(widest, first_col + max(i for i, v in enumerate(row) if v is not None))
+            if data_row in wanted:
+                raw[wanted[data_row]] = row
+            if data_row >= last_wanted:
+                break
+    finally:
+        workbook.close()
+
+    # ncol(d) - 1: the label column is not a segment
+    n_segments = max(last_col, widest) - first_col
+    values = {}
+    for name in metric_rows:
+        row = raw.get(name, ())
+        cells = list(row[1:n_segments + 1]) + [None] * (n_segments - max(len(row) - 1, 0))
+        values[name] = [parse_value(v) for v in cells[:n_segments]]
+    return values, n_segments
+
+
+# ------------------------------------------------------------
+# Summary metrics of many files in one vectorized call (overall, phasic, data quality)
+def summary_metrics_batch(extracted):
+    return study_metric_rows(extracted, list(METRIC_ROWS), KEY_METRICS, PHASIC_METRICS)
+
+
+def summary_metrics(values, n_segments):
+    return summary_metrics_batch([(values, n_segments)])[0]
+
+
+# ------------------------------------------------------------
+# One hrv_raw row from the file name and the extracted segment values
+def build_row(file_name, values, n_segments, summary=None):
+    metadata = parse_filename(file_name)
+    if metadata is None:
+        warnings.warn(f"Mismatch filename pattern in: {file_name}")
+        return None
+
+    row = dict(metadata)
+    row.update({"source_file": file_name, "data_sheet": SEGMENT_SHEET_NAME, "n_segments": n_segments})
+    for metric, segment_values in values.items():
+        for seg, value in enumerate(segment_values, start=1):
+            row[f"seg{seg}_{metric}"] = value
+    row.update(summary if summary is not None else summary_metrics(values, n_segments))
+    return row
+
+
+# ------------------------------------------------------------
+# One hrv_raw row for one export; None (with a warning) if it cannot be read
+def read_mindware_file(filename):
+    file_name = os.path.basename(filename)
+    if parse_filename(file_name) is None:
+        warnings.warn(f"Mismatch filename pattern in: {file_name}")
+        return None
+
+    try:
+        values, n_segments = read_metric_rows(filename)
+    except Exception as e:
+        warnings.warn(f"Error reading file: {filename} - {e}")
+        return None
+
+    row = build_row(file_name, values, n_segments)
+    print(f"Processed file: {file_name} - Segments: {n_segments} - Usable: {row['total_usable_segments']}")
+    return row
+
+
+# %% ---------------------------------------------------------
+# Reading all files
+# ------------------------------------------------------------
+
+def list_mindware_files(folder):
+    return [os.path.join(folder, f) for f in sorted(os.listdir(folder)) if f.lower().endswith(".xlsx")]
+
+
+# ------------------------------------------------------------
+# hrv_raw: one row per export, read in parallel
+def read_mindware_folder(folder, workers=None):
+    files = list_mindware_files(folder)
+    print(f"Found {len(files)} MindWare files to process")
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        rows = [row for row in pool.map(read_mindware_file, files, chunksize=4) if row is not None]
+    return rows_to_frame(rows)
+
+
+# ------------------------------------------------------------
+# Rows to one table; columns in hrv_raw order (bind_rows keeps first-seen order)
+def rows_to_frame(rows):
+    columns = []
+    for row in rows:
+        columns.extend(k for k in row if k not in columns)
+    return pd.DataFrame(rows, columns=columns)
+
+
+# ------------------------------------------------------------
+# hrv_clean: same quality filters as data_wrangling.R
+def clean_hrv(hrv_raw):
+    hrv_clean = hrv_raw.drop(columns=["n_segments"])
+    hrv_clean = hrv_clean[~(hrv_clean["overall_mean_hr_mean"].isna() & hrv_clean["overall_rmssd_mean"].isna())]
+    hrv_clean = hrv_clean[hrv_clean["id"].notna()]
+    return hrv_clean[hrv_clean["overall_mean_hr_mean"].between(40, 180)
+                     & hrv_clean["overall_rmssd_mean"].between(10, 200)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Read MindWare HRV Stats exports into hrv_raw")
+    parser.add_argument("folder")
+    parser.add_argument("--output", default="hrv_raw.csv")
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    hrv_raw = read_mindware_folder(args.folder, workers=args.workers)
+    hrv_raw.to_csv(args.output, index=False)
+    print(f"Saved {len(hrv_raw)} rows to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+"""
+Last Update: 10/17/2026
+
+This code is for computing the per-file summary metrics of data_wrangling.R
+(overall mean/SD, baseline, task_early, task_late, task_change, reactivity_*,
+pct_usable_segments) for the whole study at once. All participants' segment
+metrics are held in one dense (file x segment x metric) float array, padded
+with NaN, and every index is a vectorized reduction over that array.
+The 3-MAD outlier flags of detect_physiological_outliers() are computed the
+same way over the file x metric table.
+"""
+
+# %% ---------------------------------------------------------
+# Importing libraries
+# ------------------------------------------------------------
+
+import warnings
+
+import numpy as np
+
+# %% ---------------------------------------------------------
+# Settings
+# ------------------------------------------------------------
+
+# Scale of R's mad(), so that the MAD of normal data estimates the SD
+MAD_SCALE = 1.4826
+MAD_THRESHOLD = 3
+
+OUTLIER_METRICS = ["overall_mean_hr_mean", "overall_rmssd_mean", "overall_sdnn_mean"]
+
+# %% ---------------------------------------------------------
+# Segment array
+# ------------------------------------------------------------
+
+# extracted: [(values {metric: [value per segment]}, n_segments)] -> (files x segments x metrics), n_segments
+def segment_array(extracted, metrics):
+    n_segments = np.array([n for _, n in extracted], dtype=np.int64)
+    width = max(int(n_segments.max(initial=0)), 1)
+    values = np.full((len(extracted), width, len(metrics)), np.nan)
+    for i, (file_values, n) in enumerate(extracted):
+        for k, metric in enumerate(metrics):
+            segment_values = file_values.get(metric)
+            if segment_values is not None:
+                segment_values = np.asarray(segment_values[:n], dtype=np.float64)
+                values[i, :len(segment_values), k] = segment_values
+    return values, n_segments
+
+
+# ------------------------------------------------------------
+# Mean and SD (ddof=1) over the selected segments, ignoring NaN
+def _masked_mean_sd(values, select):
+    valid = ~np.isnan(values) & select[:, :, None]
+    counts = valid.sum(axis=1)
+    filled = np.where(valid, values, 0.0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean = filled.sum(axis=1) / counts
+        squares = np.where(valid, (values - mean[:, None, :]) ** 2, 0.0).sum(axis=1)
+        sd = np.where(counts > 1, squares / (counts - 1), np.nan) ** 0.5
+    return mean, sd
+
+
+# %% ---------------------------------------------------------
+# Study-wide metrics
+# ------------------------------------------------------------
+
+def study_metrics(values, n_segments, metrics, key_metrics, phasic_metrics, usable_metric="mean_hr"):
+    """
+    Returns {column: array with one value per file}, with the columns in the
+    order of data_wrangling.R. Segment 1 is the baseline; the task segments are
+    split in half (early gets the extra one).
+    """
+    positions = np.arange(values.shape[1])[None, :]
+    n = n_segments[:, None]
+    present = positions < n
+    split_point = n // 2  # ceiling((n - 1) / 2), counted from segment 2
+    early = (positions >= 1) & (positions <= split_point)
+    late = (positions > split_point) & present
+
+    columns = {}
+    overall_mean, overall_sd = _masked_mean_sd(values, present)
+    for metric in key_metrics:
+        k = metrics.index(metric)
+        columns[f"overall_{metric}_mean"] = overall_mean[:, k]
+        columns[f"overall_{metric}_sd"] = overall_sd[:, k]
+
+    baseline = np.where(n_segments[:, None] > 0, values[:, 0, :], np.nan)
+    task_early, _ = _masked_mean_sd(values, early)
+    task_late, _ = _masked_mean_sd(values, late)
+    for metric in phasic_metrics:
+        k = metrics.index(metric)
+        columns[f"{metric}_baseline"] = baseline[:, k]
+        columns[f"{metric}_task_early"] = task_early[:, k]
+        columns[f"{metric}_task_late"] = task_late[:, k]
+        columns[f"{metric}_task_change"] = task_late[:, k] - task_early[:, k]
+        columns[f"{metric}_reactivity_early"] = task_early[:, k] - baseline[:, k]
+        columns[f"{metric}_reactivity_late"] = task_late[:, k] - baseline[:, k]
+
+    usable = (~np.isnan(values[:, :, metrics.index(usable_metric)]) & present).sum(axis=1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        columns["pct_usable_segments"] = np.where(n_segments > 0, usable / n_segments * 100, np.nan)
+    columns["total_usable_segments"] = usable
+    return columns
+
+
+# ------------------------------------------------------------
+# Same as study_metrics, one {column: value} dict per file
+def study_metric_rows(extracted, metrics, key_metrics, phasic_metrics, usable_metric="mean_hr"):
+    values, n_segments = segment_array(extracted, metrics)
+    columns = study_metrics(values, n_segments, metrics, key_metrics, phasic_metrics, usable_metric)
+    return [{name: column[i].item() for name, column in columns.items()} for i in range(len(extracted))]
+
+
+# %% ---------------------------------------------------------
+# Outliers
+# ------------------------------------------------------------
+
+# |x - median| > 3 * mad(x) for every column of a (files x metrics) table; NaN is never flagged
+def mad_outliers(table, threshold=MAD_THRESHOLD):
+    table = np.asarray(table, dtype=np.float64)
+    with warnings.catch_warnings():
+        # All-NaN columns give NaN medians and no flags
+        warnings.simplefilter("ignore", RuntimeWarning)
+        median = np.nanmedian(table, axis=0)
+        mad = MAD_SCALE * np.nanmedian(np.abs(table - median), axis=0)
+    with np.errstate(invalid="ignore"):
+        return np.abs(table - median) > threshold * mad
+
+
+# ------------------------------------------------------------
+# Outlier flags of a data frame; prints the counts like detect_physiological_outliers()
+def report_outliers(frame, metrics=OUTLIER_METRICS):
+    metrics = [metric for metric in metrics if metric in frame.columns]
+    flags = mad_outliers(frame[metrics].to_numpy(dtype=np.float64))
+    for k, metric in enumerate(metrics):
+        if flags[:, k].any():
+            print(f"Outliers detected in {metric} : {int(flags[:, k].sum())} cases")
+    return {metric: np.flatnonzero(flags[:, k]) for k, metric in enumerate(metrics)}
@@ -0,0 +1,172 @@
+"""
+Last Update: 10/17/2026
+
+This code is for storing the intermediate datasets of the pipeline
+(Cleaned_ECG_Data, Merged_Data_Before_Imputation, Final_Analysis_Dataset) as
+typed Parquet datasets partitioned by task_type instead of wide text CSVs.
+Later stages load only the columns (and task types) they need, memory-mapped,
+without parsing text. CSV is still available as an optional sink for the R scripts.
+
+Layout (output folder):
+    <name>/task_type=AQ/part-0.parquet
+    <name>/task_type=EXT/part-0.parquet
+    <name>.csv                           (optional)
+"""
+
+# %% ---------------------------------------------------------
+# Importing libraries
+# ------------------------------------------------------------
+
+import glob
+import os
+import shutil
+import time
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+# %% ---------------------------------------------------------
+# Settings
+# ------------------------------------------------------------
+
+# Same output folder as the R scripts
+OUTPUT_DIR = "D:/Research/FPS (Ruvvy RLab)/Codes/Output"
+
+CLEANED_ECG = "Cleaned_ECG_Data"
+MERGED_BEFORE_IMPUTATION = "Merged_Data_Before_Imputation"
+FINAL_ANALYSIS = "Final_Analysis_Dataset"
+
+PARTITION_COLUMN = "task_type"
+
+# Longest time a reader waits for a dataset that is being swapped (seconds)
+SWAP_WAIT = 5
+
+# %% ---------------------------------------------------------
+# Paths
+# ------------------------------------------------------------
+
+def dataset_path(name, output_dir=OUTPUT_DIR):
+    return os.path.join(output_dir, name)
+
+
+def csv_path(name, output_dir=OUTPUT_DIR):
+    return os.path.join(output_dir, f"{name}.csv")
+
+
+def has_dataset(name, output_dir=OUTPUT_DIR):
+    return os.path.isdir(dataset_path(name, output_dir))
+
+
+# %% ---------------------------------------------------------
+# Writing
+# ------------------------------------------------------------
+
+# Typed Parquet dataset partitioned by task_type; optionally also the CSV
+def write_dataset(frame, name, output_dir=OUTPUT_DIR, partition_by=PARTITION_COLUMN, csv=False):
+    path = dataset_path(name, output_dir)
+    table = pa.Table.from_pandas(frame, preserve_index=False)
+    partitioning = None
+    if partition_by in table.column_names:
+        if pa.types.is_null(table.schema.field(partition_by).type):
+            # An empty (or all-NA) object column has no type; task types are strings
+            index = table.column_names.index(partition_by)
+            table = table.set_column(index, partition_by, table.column(partition_by).cast(pa.string()))
+        partitioning = ds.partitioning(pa.schema([table.schema.field(partition_by)]), flavor="hive")
+
+    # Written next to the old dataset and swapped in, so readers never see a half-written one;
+    # the old dataset is renamed aside first and deleted only after the new one is in place
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    old_path = f"{path}.{os.getpid()}.old"
+    shutil.rmtree(tmp_path, ignore_errors=True)
+    if table.num_rows:
+        ds.write_dataset(table, tmp_path, format="parquet", partitioning=partitioning,
+                         basename_template="part-{i}.parquet")
+    else:
+        # No rows, no partitions: one schema-only file keeps the columns and types readable
+        os.makedirs(tmp_path)
+        pq.write_table(table, os.path.join(tmp_path, "part-0.parquet"))
+
+    if os.path.isdir(path):
+        os.replace(path, old_path)
+    try:
+        os.replace(tmp_path, path)
+    except OSError:
+        if os.path.isdir(old_path):
+            os.replace(old_path, path)
+        raise
+    shutil.rmtree(old_path, ignore_errors=True)
+
+    if csv:
+        frame.to_csv(csv_path(name, output_dir), index=False)
+    return path
+
+
+# %% ---------------------------------------------------------
+# Reading
+# ------------------------------------------------------------
+
+# Waiting out a writer between renaming the old dataset aside and moving the new one in
+def _wait_for_swap(name, output_dir=OUTPUT_DIR, timeout=SWAP_WAIT):
+    path = dataset_path(name, output_dir)
+    start_time = time.time()
+    while not os.path.isdir(path) and glob.glob(glob.escape(path) + ".*.old"):
+        if time.time() - start_time >= timeout:
+            break
+        time.sleep(0.05)
+    return os.path.isdir(path)
+
+
+# ------------------------------------------------------------
+# Column order as written (hive reads move the partition column to the end)
+def _written_order(schema, columns=None):
+    if columns is not None:
+        return [column for column in columns if column in schema.names]
+    metadata = schema.pandas_metadata or {}
+    written = [column["name"] for column in metadata.get("columns", [])]
+    order = [column for column in written if column in schema.names]
+    return order + [column for column in schema.names if column not in order]
+
+
+# ------------------------------------------------------------
+# Only the wanted columns and task types, memory-mapped
+def read_dataset(name, output_dir=OUTPUT_DIR, columns=None, task_types=None):
+    """
+    Falls back to <name>.csv when the Parquet dataset has not been written yet
+    (e.g. the stage before was the R script).
+    """
+    if not _wait_for_swap(name, output_dir):
+        # The partition column is read for the filter even when it was not asked for
+        usecols = columns
+        if columns is not None and task_types is not None and PARTITION_COLUMN not in columns:
+            usecols = list(columns) + [PARTITION_COLUMN]
+        frame = pd.read_csv(csv_path(name, output_dir), usecols=usecols)
+        if task_types is not None:
+            frame = frame[frame[PARTITION_COLUMN].isin(task_types)].reset_index(drop=True)
+        if columns is not None:
+            frame = frame[list(columns)]
+        return frame
+
+    filters = [(PARTITION_COLUMN, "in", list(task_types))] if task_types is not None else None
+    table = pq.read_table(dataset_path(name, output_dir), columns=columns, filters=filters,
+                          memory_map=True, partitioning="hive")
+    if PARTITION_COLUMN in table.column_names:
+        # Partition values come back dictionary-encoded; same type as written
+        index = table.column_names.index(PARTITION_COLUMN)
+        table = table.set_column(index, PARTITION_COLUMN, table.column(PARTITION_COLUMN).cast(pa.string()))
+    return table.select(_written_order(table.schema, columns)).to_pandas()
+
+
+# ------------------------------------------------------------
+# Column names without reading any data
+def dataset_columns(name, output_dir=OUTPUT_DIR):
+    if not has_dataset(name, output_dir):
+        return list(pd.read_csv(csv_path(name, output_dir), nrows=0).columns)
+    return _written_order(ds.dataset(dataset_path(name, output_dir), format="parquet", partitioning="hive").schema)
+
+
+# ------------------------------------------------------------
+# Converting a CSV written by the R scripts into a Parquet dataset
+def csv_to_dataset(name, output_dir=OUTPUT_DIR):
+    return write_dataset(pd.read_csv(csv_path(name, output_dir)), name, output_dir)
@@ -0,0 +1,189 @@
+"""
+Last Update: 10/17/2026
+
+This code is for incremental wrangling of the MindWare exports: the per-segment
+metrics extracted from every workbook are cached on disk, keyed by the content
+hash of the workbook and the extractor version (mindware_reader.EXTRACTOR_VERSION).
+A later run only parses the exports that are new or changed; every other row is
+rebuilt from the cache, so adding one participant takes seconds.
+
+Cache layout (cache folder):
+    index.json                       path -> size, mtime and content hash
+    v<version>_<content hash>.json   extracted values and n_segments of one workbook
+
+Usage:
+    python wrangling_cache.py <MindWare_Files folder> [--cache-dir .wrangling_cache]
+                              [--output hrv_raw.csv] [--output-dir <Output folder>] [--csv] [--workers N]
+
+hrv_clean is saved as the Cleaned_ECG_Data Parquet dataset (pipeline_storage.py);
+--csv also writes Cleaned_ECG_Data.csv for the R scripts.
+"""
+
+# %% ---------------------------------------------------------
+# Importing libraries
+# ------------------------------------------------------------
+
+import argparse
+import hashlib
+import json
+import os
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+
+from mindware_reader import (EXTRACTOR_VERSION, build_row, clean_hrv, list_mindware_files,
+                             parse_filename, read_metric_rows, rows_to_frame, summary_metrics_batch)
+from phasic_metrics import report_outliers
+from pipeline_storage import CLEANED_ECG, OUTPUT_DIR, write_dataset
+
+# %% ---------------------------------------------------------
+# Settings
+# ------------------------------------------------------------
+
+DEFAULT_CACHE_DIR = ".wrangling_cache"
+INDEX_NAME = "index.json"
+HASH_CHUNK_SIZE = 1024 * 1024
+
+# %% ---------------------------------------------------------
+# Cache files
+# ------------------------------------------------------------
+
+def file_hash(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def entry_path(cache_dir, content_hash, version=EXTRACTOR_VERSION):
+    return os.path.join(cache_dir, f"v{version}_{content_hash}.json")
+
+
+def _read_json(path, default):
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return default
+
+
+# Temporary file + os.replace, so an interrupted run never leaves a broken entry
+def _write_json(path, data):
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f)
+    os.replace(tmp_path, path)
+
+
+# ------------------------------------------------------------
+# Content hash of every export (reused from the index while size/mtime are unchanged)
+def hash_files(files, index):
+    hashes = {}
+    for path in files:
+        stat = os.stat(path)
+        entry = index.get(os.path.abspath(path))
+        if entry and entry["size"] == stat.st_size and entry["mtime"] == stat.st_mtime:
+            hashes[path] = entry["hash"]
+        else:
+            hashes[path] = file_hash(path)
+            index[os.path.abspath(path)] = {"size": stat.st_size, "mtime": stat.st_mtime, "hash": hashes[path]}
+    return hashes
+
+
+# %% ---------------------------------------------------------
+# Extraction
+# ------------------------------------------------------------
+
+# Runs in the worker; None (with a warning) if the workbook cannot be read
+def extract_file(filename):
+    try:
+        values, n_segments = read_metric_rows(filename)
+    except Exception as e:
+        warnings.warn(f"Error reading file: {filename} - {e}")
+        return None
+    return {"values": values, "n_segments": n_segments}
+
+
+# ------------------------------------------------------------
+# hrv_raw from the cache plus the exports that are new or changed
+def read_mindware_folder_cached(folder, cache_dir=DEFAULT_CACHE_DIR, workers=None):
+    os.makedirs(cache_dir, exist_ok=True)
+    index_path = os.path.join(cache_dir, INDEX_NAME)
+    index = _read_json(index_path, {})
+
+    files = []
+    for path in list_mindware_files(folder):
+        if parse_filename(os.path.basename(path)) is None:
+            warnings.warn(f"Mismatch filename pattern in: {os.path.basename(path)}")
+        else:
+            files.append(path)
+    hashes = hash_files(files, index)
+    _write_json(index_path, index)
+
+    extracted = {}
+    for path in files:
+        cached = _read_json(entry_path(cache_dir, hashes[path]), None)
+        if cached is not None:
+            extracted[path] = cached
+    missing = [path for path in files if path not in extracted]
+    print(f"Found {len(files)} MindWare files: {len(extracted)} cached, {len(missing)} to process")
+
+    if missing:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for path, result in zip(missing, pool.map(extract_file, missing, chunksize=4)):
+                if result is None:
+                    continue
+                _write_json(entry_path(cache_dir, hashes[path]), result)
+                extracted[path] = result
+                print(f"Processed file: {os.path.basename(path)} - Segments: {result['n_segments']}")
+
+    # Summary metrics of the whole study in one call
+    files = [path for path in files if path in extracted]
+    summaries = summary_metrics_batch([(extracted[path]["values"], extracted[path]["n_segments"]) for path in files])
+    rows = [build_row(os.path.basename(path), extracted[path]["values"], extracted[path]["n_segments"], summary)
+            for path, summary in zip(files, summaries)]
+    return rows_to_frame(rows)
+
+
+# ------------------------------------------------------------
+# Removing cache entries of older extractor versions and of exports no longer in the index
+def prune_cache(cache_dir=DEFAULT_CACHE_DIR):
+    index = _read_json(os.path.join(cache_dir, INDEX_NAME), {})
+    live_hashes = {entry["hash"] for path, entry in index.items() if os.path.exists(path)}
+    removed = 0
+    for name in os.listdir(cache_dir):
+        if name == INDEX_NAME or not name.endswith(".json"):
+            continue
+        version, _, content_hash = name[:-len(".json")].partition("_")
+        if version != f"v{EXTRACTOR_VERSION}" or content_hash not in live_hashes:
+            os.remove(os.path.join(cache_dir, name))
+            removed += 1
+    return removed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Incrementally read MindWare HRV Stats exports into hrv_raw")
+    parser.add_argument("folder")
+    parser.add_argument("--cache-dir", default=DEFAULT_CACHE_DIR)
+    parser.add_argument("--output", default="hrv_raw.csv")
+    parser.add_argument("--output-dir", default=OUTPUT_DIR)
+    parser.add_argument("--csv", action="store_true", help="also write Cleaned_ECG_Data.csv")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--prune", action="store_true", help="remove stale cache entries after the run")
+    args = parser.parse_args()
+
+    hrv_raw = read_mindware_folder_cached(args.folder, cache_dir=args.cache_dir, workers=args.workers)
+    hrv_raw.to_csv(args.output, index=False)
+    print(f"Saved {len(hrv_raw)} rows to {args.output}")
+    report_outliers(hrv_raw)
+
+    hrv_clean = clean_hrv(hrv_raw)
+    path = write_dataset(hrv_clean, CLEANED_ECG, args.output_dir, csv=args.csv)
+    print(f"Saved {len(hrv_clean)} rows to {path}")
+
+    if args.prune:
+        print(f"Removed {prune_cache(args.cache_dir)} stale cache entries")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,14 @@
+"""
+The GUI modules (Python_MindWareProcess) and the wrangling modules (Scripts)
+are plain script folders importing each other by module name.
+"""
+
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+for folder in ("Python_MindWareProcess", "Scripts"):
+    path = os.path.join(ROOT, folder)
+    if path not in sys.path:
+        sys.path.insert(0, path)
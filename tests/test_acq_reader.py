@@ -0,0 +1,25 @@
+import pytest
+
+pytest.importorskip("bioread")
+
+import acq_reader
+from acq_reader import segment_count
+
+
+@pytest.mark.parametrize("duration, expected", [
+    (600.0, 10),
+    (600.0000001, 10),
+    (600.5, 11),
+    (59.0, 1),
+    (0.0, 1),
+])
+def test_segment_count_rounding(monkeypatch, duration, expected):
+    monkeypatch.setattr(acq_reader, "recording_duration", lambda path: duration)
+    assert segment_count("recording.acq", 60) == expected
+
+
+def test_segment_count_unreadable_header(monkeypatch):
+    def unreadable(path):
+        raise ValueError("no headers")
+    monkeypatch.setattr(acq_reader, "recording_duration", unreadable)
+    assert segment_count("recording.acq", 60) is None
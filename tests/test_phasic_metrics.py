@@ -0,0 +1,128 @@
+import math
+import statistics
+
+import numpy as np
+import pytest
+
+pytest.importorskip("openpyxl")
+
+import openpyxl
+
+from mindware_reader import KEY_METRICS, METRIC_ROWS, read_metric_rows, summary_metrics
+from phasic_metrics import mad_outliers
+
+
+# Summary section of data_wrangling.R, statement by statement
+def r_summary(values, n_segments):
+    def mean_na(xs):
+        xs = [x for x in xs if not math.isnan(x)]
+        return sum(xs) / len(xs) if xs else math.nan
+
+    def sd_na(xs):
+        xs = [x for x in xs if not math.isnan(x)]
+        return statistics.stdev(xs) if len(xs) > 1 else math.nan
+
+    result = {}
+    for metric in KEY_METRICS:
+        segment_values = [values[metric][seg - 1] for seg in range(1, n_segments + 1)]
+        result[f"overall_{metric}_mean"] = mean_na(segment_values)
+        result[f"overall_{metric}_sd"] = sd_na(segment_values)
+
+    # `metric` is left at the last key metric by the loop above
+    metric = KEY_METRICS[-1]
+    task_segments = list(range(2, n_segments + 1))
+    split_point = math.ceil(len(task_segments) / 2)
+    early_task_segments = task_segments[:split_point]
+    late_task_segments = task_segments[split_point:]
+
+    baseline = values[metric][0]
+    early = mean_na([values[metric][seg - 1] for seg in early_task_segments])
+    late = mean_na([values[metric][seg - 1] for seg in late_task_segments])
+    result[f"{metric}_baseline"] = baseline
+    result[f"{metric}_task_early"] = early
+    result[f"{metric}_task_late"] = late
+    result[f"{metric}_task_change"] = late - early
+    result[f"{metric}_reactivity_early"] = early - baseline
+    result[f"{metric}_reactivity_late"] = late - baseline
+
+    hr_values = [values["mean_hr"][seg - 1] for seg in range(1, n_segments + 1)]
+    usable = [not math.isnan(x) for x in hr_values]
+    result["pct_usable_segments"] = sum(usable) / len(usable) * 100
+    result["total_usable_segments"] = sum(usable)
+    return result
+
+
+def assert_same(python, r):
+    assert set(r) <= set(python)
+    for name, expected in r.items():
+        if math.isnan(expected):
+            assert math.isnan(python[name]), name
+        else:
+            assert python[name] == pytest.approx(expected, rel=1e-12), name
+
+
+# R needs at least one early and one late task segment (n_segments >= 3)
+@pytest.mark.parametrize("n_segments", [3, 4, 5, 6, 11, 20])
+def test_summary_matches_r(n_segments):
+    rng = np.random.default_rng(n_segments)
+    for _ in range(50):
+        values = {}
+        for metric in METRIC_ROWS:
+            column = rng.normal(70, 15, n_segments)
+            column[rng.random(n_segments) < 0.25] = np.nan
+            values[metric] = column.tolist()
+        assert_same(summary_metrics(values, n_segments), r_summary(values, n_segments))
+
+
+def test_early_late_split_uses_ceiling():
+    # 4 segments: baseline 1, task 2-4, early 2-3 (ceiling(3 / 2) = 2), late 4
+    values = {metric: [1.0, 2.0, 4.0, 10.0] for metric in METRIC_ROWS}
+    summary = summary_metrics(values, 4)
+    assert summary["sdnn_task_early"] == 3.0
+    assert summary["sdnn_task_late"] == 10.0
+
+
+def test_all_missing_phase_is_nan():
+    values = {metric: [1.0, np.nan, np.nan, 5.0, 7.0] for metric in METRIC_ROWS}
+    summary = summary_metrics(values, 5)
+    assert math.isnan(summary["sdnn_task_early"])
+    assert summary["sdnn_task_late"] == 6.0
+    assert summary["total_usable_segments"] == 3
+
+
+# ------------------------------------------------------------
+# "last real segment": cells after the last real value, "N/A" and text are NA
+def write_export(path, rows, n_columns):
+    workbook = openpyxl.Workbook()
+    sheet = workbook.active
+    sheet.title = "HRV Stats"
+    sheet.append(["Name"] + [f"Segment {seg}" for seg in range(1, n_columns + 1)])
+    for data_row in range(1, max(METRIC_ROWS.values()) + 1):
+        name = next((metric for metric, row in METRIC_ROWS.items() if row == data_row), f"row {data_row}")
+        sheet.append([name] + rows.get(name, []))
+    workbook.save(path)
+
+
+def test_last_real_segment_handling(tmp_path):
+    path = tmp_path / "export.xlsx"
+    rows = {
+        "mean_hr": [61.5, "N/A", "72", 80.25, "N/A", "N/A"],
+        "sdnn": [40, 41, "abc", 43],
+        "rmssd": ["N/A"] * 6,
+        "segment_duration": [60] * 6,
+    }
+    write_export(path, rows, n_columns=6)
+    values, n_segments = read_metric_rows(str(path))
+
+    assert n_segments == 6
+    np.testing.assert_array_equal(values["mean_hr"], [61.5, np.nan, 72.0, 80.25, np.nan, np.nan])
+    np.testing.assert_array_equal(values["sdnn"], [40.0, 41.0, np.nan, 43.0, np.nan, np.nan])
+    assert all(math.isnan(x) for x in values["rmssd"])
+    assert_same(summary_metrics(values, n_segments), r_summary(values, n_segments))
+
+
+def test_mad_outliers_match_r_mad():
+    table = np.array([[10.0], [11.0], [12.0], [11.5], [10.5], [50.0], [np.nan]])
+    flags = mad_outliers(table)
+    # median 11.25, mad() = 1.4826 * 0.75; only 50 is beyond 3 MADs, NA is never flagged
+    assert flags[:, 0].tolist() == [False, False, False, False, False, True, False]
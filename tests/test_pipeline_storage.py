@@ -0,0 +1,61 @@
+import pandas as pd
+import pytest
+
+pytest.importorskip("pyarrow")
+
+from pipeline_storage import csv_path, dataset_columns, read_dataset, write_dataset
+
+NAME = "Cleaned_ECG_Data"
+
+
+@pytest.fixture
+def frame():
+    return pd.DataFrame({
+        "id": [1, 2, 3],
+        "task_type": ["AQ", "EXT", "AQ"],
+        "overall_mean_hr_mean": [61.0, 72.5, 80.0],
+    })
+
+
+def test_csv_fallback_filters_on_unrequested_partition_column(tmp_path, frame):
+    frame.to_csv(csv_path(NAME, str(tmp_path)), index=False)
+    result = read_dataset(NAME, str(tmp_path), columns=["id", "overall_mean_hr_mean"], task_types=["AQ"])
+    assert list(result.columns) == ["id", "overall_mean_hr_mean"]
+    assert result["id"].tolist() == [1, 3]
+
+
+def test_parquet_keeps_written_column_order(tmp_path, frame):
+    write_dataset(frame, NAME, str(tmp_path))
+    result = read_dataset(NAME, str(tmp_path)).sort_values("id").reset_index(drop=True)
+    assert list(result.columns) == list(frame.columns)
+    assert dataset_columns(NAME, str(tmp_path)) == list(frame.columns)
+    pd.testing.assert_frame_equal(result, frame)
+
+
+def test_parquet_columns_and_task_types(tmp_path, frame):
+    write_dataset(frame, NAME, str(tmp_path))
+    result = read_dataset(NAME, str(tmp_path), columns=["overall_mean_hr_mean", "id"], task_types=["EXT"])
+    assert list(result.columns) == ["overall_mean_hr_mean", "id"]
+    assert result["id"].tolist() == [2]
+
+
+def test_rewrite_replaces_dataset(tmp_path, frame):
+    write_dataset(frame, NAME, str(tmp_path))
+    write_dataset(frame.iloc[:1], NAME, str(tmp_path))
+    assert read_dataset(NAME, str(tmp_path))["id"].tolist() == [1]
+    assert sorted(p.name for p in tmp_path.iterdir()) == [NAME]
+
+
+def test_empty_frame_replaces_dataset(tmp_path, frame):
+    write_dataset(frame, NAME, str(tmp_path))
+    write_dataset(frame.iloc[:0], NAME, str(tmp_path))
+    assert sorted(p.name for p in tmp_path.iterdir()) == [NAME]
+    result = read_dataset(NAME, str(tmp_path), task_types=["AQ"])
+    assert result.empty
+    assert list(result.columns) == list(frame.columns)
+
+
+def test_empty_object_partition_column(tmp_path):
+    empty = pd.DataFrame({"id": pd.Series([], dtype="int64"), "task_type": pd.Series([], dtype=object)})
+    write_dataset(empty, NAME, str(tmp_path))
+    assert read_dataset(NAME, str(tmp_path), task_types=["AQ"]).empty
@@ -0,0 +1,109 @@
+import socket
+import time
+
+import pytest
+
+import resume_manifest
+from resume_manifest import EXPORTED, FAILED, IN_PROGRESS, ResumeManifest
+
+
+class FakePsutil:
+
+    def __init__(self, alive_pids):
+        self.alive_pids = alive_pids
+
+    def pid_exists(self, pid):
+        return pid in self.alive_pids
+
+
+@pytest.fixture
+def data_file(tmp_path):
+    path = tmp_path / "subject_01.acq"
+    path.write_bytes(b"acq data")
+    return str(path)
+
+
+def runner(tmp_path, pid, host=None):
+    manifest = ResumeManifest(str(tmp_path / "manifest.json"))
+    manifest.runner_id = f"{host or socket.gethostname()}:{pid}"
+    return manifest
+
+
+def test_claim_and_export(tmp_path, data_file):
+    first = runner(tmp_path, 1)
+    assert first.claim(data_file)
+    assert first.status(data_file) == IN_PROGRESS
+    first.mark(data_file, EXPORTED, export_path="out.xlsx")
+    assert not runner(tmp_path, 2).claim(data_file)
+
+
+def test_same_host_claim_kept_without_psutil(tmp_path, data_file, monkeypatch):
+    monkeypatch.setattr(resume_manifest, "psutil", None)
+    assert runner(tmp_path, 1).claim(data_file)
+    assert not runner(tmp_path, 2).claim(data_file)
+
+
+def test_claim_without_heartbeat_taken_without_psutil(tmp_path, data_file, monkeypatch):
+    monkeypatch.setattr(resume_manifest, "psutil", None)
+    first = runner(tmp_path, 1)
+    assert first.claim(data_file)
+    start = time.time()
+    monkeypatch.setattr(resume_manifest.time, "time", lambda: start + resume_manifest.STALE_CLAIM_AGE - 1)
+    first.heartbeat(data_file)
+    monkeypatch.setattr(resume_manifest.time, "time", lambda: start + resume_manifest.STALE_CLAIM_AGE + 10)
+    assert not runner(tmp_path, 2).claim(data_file)
+    monkeypatch.setattr(resume_manifest.time, "time", lambda: start + 2 * resume_manifest.STALE_CLAIM_AGE)
+    assert runner(tmp_path, 2).claim(data_file)
+
+
+def test_fresh_lock_of_dead_runner_broken(tmp_path, data_file, monkeypatch):
+    monkeypatch.setattr(resume_manifest, "psutil", FakePsutil(alive_pids={2}))
+    crashed = runner(tmp_path, 1)
+    with open(crashed.lock_path, "w", encoding="utf-8") as f:
+        f.write(crashed.runner_id)
+    start = time.time()
+    assert runner(tmp_path, 2).claim(data_file)
+    assert time.time() - start < 5
+
+
+def test_fresh_lock_waited_out_without_psutil(tmp_path, data_file, monkeypatch):
+    monkeypatch.setattr(resume_manifest, "psutil", None)
+    crashed = runner(tmp_path, 1)
+    with open(crashed.lock_path, "w", encoding="utf-8") as f:
+        f.write(crashed.runner_id)
+    start = time.time()
+    clock = [start]
+    monkeypatch.setattr(resume_manifest.time, "time", lambda: clock[0])
+    monkeypatch.setattr(resume_manifest.time, "sleep", lambda seconds: clock.__setitem__(0, clock[0] + seconds))
+    # The leftover lock is broken once it is stale, before the wait for it times out
+    assert runner(tmp_path, 2).claim(data_file)
+    assert clock[0] - start >= resume_manifest.STALE_LOCK_AGE
+
+
+def test_claim_of_dead_runner_taken_back(tmp_path, data_file, monkeypatch):
+    monkeypatch.setattr(resume_manifest, "psutil", FakePsutil(alive_pids={2}))
+    assert runner(tmp_path, 1).claim(data_file)
+    assert runner(tmp_path, 2).claim(data_file)
+
+
+def test_claim_of_live_runner_kept(tmp_path, data_file, monkeypatch):
+    monkeypatch.setattr(resume_manifest, "psutil", FakePsutil(alive_pids={1, 2}))
+    assert runner(tmp_path, 1).claim(data_file)
+    assert not runner(tmp_path, 2).claim(data_file)
+
+
+def test_stale_claim_taken(tmp_path, data_file, monkeypatch):
+    monkeypatch.setattr(resume_manifest, "psutil", None)
+    assert runner(tmp_path, 1, host="other-host").claim(data_file)
+    later = time.time() + resume_manifest.STALE_CLAIM_AGE + 1
+    monkeypatch.setattr(resume_manifest.time, "time", lambda: later)
+    assert runner(tmp_path, 2).claim(data_file)
+
+
+def test_failed_file_keeps_its_state(tmp_path, data_file):
+    manifest = runner(tmp_path, 1)
+    manifest.claim(data_file)
+    manifest.mark(data_file, IN_PROGRESS, state="configured")
+    manifest.mark(data_file, FAILED, error="hung")
+    assert manifest.entry(data_file)["state"] == "configured"
+    assert manifest.claim(data_file)
@@ -0,0 +1,38 @@
+import pytest
+
+pytest.importorskip("pyautogui")
+pytest.importorskip("pytesseract")
+
+import settings_state
+from settings_state import SettingsState
+
+TARGET = {"segment_time": 60, "calculation": "Entire", "lf_high": 0.15, "output_folder": "C:/out"}
+
+
+def test_everything_written_in_a_new_session(monkeypatch):
+    monkeypatch.setattr(settings_state, "read_page_values", lambda tab=None: pytest.fail("no OCR needed"))
+    assert SettingsState().fields_to_write(TARGET) == set(TARGET)
+
+
+def test_nothing_written_when_the_page_matches(monkeypatch):
+    monkeypatch.setattr(settings_state, "read_page_values", lambda tab=None: {"segment_time": 60.0})
+    state = SettingsState()
+    state.mark_applied(TARGET, TARGET)
+    assert state.fields_to_write(TARGET) == set()
+
+
+@pytest.mark.parametrize("shown", [90.0, None])
+def test_field_rewritten_when_it_shows_another_value(monkeypatch, shown):
+    monkeypatch.setattr(settings_state, "read_page_values", lambda tab=None: {"segment_time": shown})
+    state = SettingsState()
+    state.mark_applied(TARGET, TARGET)
+    assert state.fields_to_write(TARGET) == {"segment_time"}
+
+
+def test_changed_target_and_reset(monkeypatch):
+    monkeypatch.setattr(settings_state, "read_page_values", lambda tab=None: {"segment_time": 60.0})
+    state = SettingsState()
+    state.mark_applied(TARGET, TARGET)
+    assert state.fields_to_write(dict(TARGET, lf_high=0.2)) == {"lf_high"}
+    state.reset()
+    assert state.fields_to_write(TARGET) == set(TARGET)